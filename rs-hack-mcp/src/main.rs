@@ -18,7 +18,7 @@ async fn main() -> Result<()> {
 
     // Create and run the MCP server using stdio
     let server = mcp::Server::new();
-    server.run()?;
+    server.run().await?;
 
     Ok(())
 }
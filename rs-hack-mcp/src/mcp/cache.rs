@@ -0,0 +1,357 @@
+//! Memoization for the long-running MCP server process.
+//!
+//! - [`ResultCache`] memoizes read-only tool results and dry runs. A key is the tool name, its
+//!   serialized arguments, and the (path, mtime, length) of every `.rs` file the `paths`/`path`
+//!   argument resolves to. Editing, adding, or removing any scanned file changes the key, so stale
+//!   entries are never served; they just age out. Calls over a file modified within mtime
+//!   granularity of now are not cached, since a further edit might not move its mtime.
+//! - [`GlobCache`] memoizes the expansion of `paths` patterns themselves.
+
+use std::collections::{BTreeSet, HashMap, VecDeque};
+use std::path::{Path, PathBuf};
+use std::sync::Mutex;
+use std::time::{Duration, SystemTime};
+
+use anyhow::Result;
+use rs_hack::files::{collect_rust_files, rust_file_dirs};
+use serde_json::Value;
+
+/// Number of results kept before the least recently used is evicted.
+const CAPACITY: usize = 128;
+
+/// Coarsest mtime resolution among common filesystems.
+const MTIME_GRANULARITY: Duration = Duration::from_secs(2);
+
+#[derive(Debug, Clone, PartialEq, Eq, Hash)]
+pub struct CacheKey {
+    tool: String,
+    arguments: String,
+    files: Vec<(PathBuf, Option<SystemTime>, u64)>,
+}
+
+impl CacheKey {
+    /// Fingerprint a call. Returns `None` when the call has no `paths`/`path`
+    /// argument, the files can't be listed, or one of them changed too
+    /// recently for its mtime to be trusted — such calls are not cached.
+    pub fn new(tool: &str, arguments: &Value, globs: &GlobCache) -> Option<Self> {
+        let pattern = arguments
+            .get("paths")
+            .or_else(|| arguments.get("path"))
+            .and_then(Value::as_str)?;
+
+        let files: Vec<_> = globs
+            .expand(pattern)
+            .ok()?
+            .into_iter()
+            .map(|path| {
+                let meta = std::fs::metadata(&path).ok();
+                let modified = meta.as_ref().and_then(|m| m.modified().ok());
+                let len = meta.map_or(0, |m| m.len());
+                (path, modified, len)
+            })
+            .collect();
+
+        // A same-length edit within one mtime tick would leave the key as is
+        if !files.iter().all(|(_, modified, _)| is_settled(*modified)) {
+            return None;
+        }
+
+        Some(Self {
+            tool: tool.to_string(),
+            arguments: arguments.to_string(),
+            files,
+        })
+    }
+}
+
+#[derive(Default)]
+struct Entries {
+    results: HashMap<CacheKey, String>,
+    /// Recency order, least recently used first.
+    order: VecDeque<CacheKey>,
+}
+
+#[derive(Default)]
+pub struct ResultCache {
+    entries: Mutex<Entries>,
+}
+
+impl ResultCache {
+    pub fn get(&self, key: &CacheKey) -> Option<String> {
+        let mut entries = self.entries.lock().ok()?;
+        let hit = entries.results.get(key).cloned()?;
+
+        if let Some(pos) = entries.order.iter().position(|k| k == key)
+            && let Some(k) = entries.order.remove(pos)
+        {
+            entries.order.push_back(k);
+        }
+
+        Some(hit)
+    }
+
+    pub fn insert(&self, key: CacheKey, result: String) {
+        let Ok(mut entries) = self.entries.lock() else {
+            return;
+        };
+
+        if entries.results.insert(key.clone(), result).is_none() {
+            entries.order.push_back(key);
+        }
+
+        while entries.order.len() > CAPACITY {
+            if let Some(oldest) = entries.order.pop_front() {
+                entries.results.remove(&oldest);
+            }
+        }
+    }
+}
+
+/// Expanded file lists for `paths` patterns.
+///
+/// Creating, removing, or renaming a directory entry bumps that directory's
+/// mtime, so an expansion stays valid for as long as every directory the
+/// expansion listed keeps the mtime it had when the pattern was expanded
+/// (see [`rust_file_dirs`]), along with the pattern's static root.
+/// Revalidating is one stat per such directory instead of a glob walk that
+/// touches every file.
+#[derive(Default)]
+pub struct GlobCache {
+    entries: Mutex<HashMap<String, GlobEntry>>,
+}
+
+struct GlobEntry {
+    files: Vec<PathBuf>,
+    stamps: Vec<(PathBuf, Option<SystemTime>)>,
+}
+
+impl GlobEntry {
+    fn is_fresh(&self) -> bool {
+        self.stamps
+            .iter()
+            .all(|(path, stamp)| modified(path) == *stamp)
+    }
+}
+
+impl GlobCache {
+    /// Resolve `pattern` (a file, directory, or glob) to its `.rs` files.
+    pub fn expand(&self, pattern: &str) -> Result<Vec<PathBuf>> {
+        if let Ok(entries) = self.entries.lock()
+            && let Some(entry) = entries.get(pattern)
+            && entry.is_fresh()
+        {
+            return Ok(entry.files.clone());
+        }
+
+        let files = collect_rust_files(&[PathBuf::from(pattern)])?;
+        let stamps = directory_stamps(pattern);
+
+        // A directory changed within mtime granularity of now could change
+        // again without its stamp moving, so such expansions aren't kept
+        if stamps.iter().all(|(_, stamp)| is_settled(*stamp))
+            && let Ok(mut entries) = self.entries.lock()
+        {
+            entries.insert(
+                pattern.to_string(),
+                GlobEntry {
+                    files: files.clone(),
+                    stamps,
+                },
+            );
+        }
+
+        Ok(files)
+    }
+
+    /// Drop every memoized expansion.
+    pub fn invalidate(&self) {
+        if let Ok(mut entries) = self.entries.lock() {
+            entries.clear();
+        }
+    }
+}
+
+fn modified(path: &Path) -> Option<SystemTime> {
+    std::fs::metadata(path).and_then(|m| m.modified()).ok()
+}
+
+/// Leading path components of `pattern` that contain no glob metacharacters.
+fn static_root(pattern: &str) -> PathBuf {
+    let mut root = PathBuf::new();
+    for component in Path::new(pattern).components() {
+        if component
+            .as_os_str()
+            .to_string_lossy()
+            .contains(['*', '?', '['])
+        {
+            break;
+        }
+        root.push(component);
+    }
+
+    if root.as_os_str().is_empty() {
+        PathBuf::from(".")
+    } else {
+        root
+    }
+}
+
+/// The pattern's static root plus every directory its expansion listed, each
+/// with its current mtime. Stamped after the walk; a directory that changed
+/// during it is recent enough to fail [`is_settled`].
+fn directory_stamps(pattern: &str) -> Vec<(PathBuf, Option<SystemTime>)> {
+    let mut dirs = BTreeSet::from([static_root(pattern)]);
+    dirs.extend(rust_file_dirs(Path::new(pattern)));
+
+    dirs.into_iter()
+        .map(|dir| {
+            let stamp = modified(&dir);
+            (dir, stamp)
+        })
+        .collect()
+}
+
+/// Whether `stamp` is far enough in the past that a further change would
+/// move it. Shared by both caches' freshness checks. Filesystems with coarse timestamps round
+/// mtimes to a second (two on FAT).
+fn is_settled(stamp: Option<SystemTime>) -> bool {
+    stamp.is_none_or(|stamp| {
+        SystemTime::now()
+            .duration_since(stamp)
+            .is_ok_and(|age| age > MTIME_GRANULARITY)
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use std::fs;
+    use std::time::Duration;
+
+    use tempfile::TempDir;
+
+    use super::*;
+
+    /// Push `path`'s mtime well past `MTIME_GRANULARITY`, so caches trust it.
+    fn backdate(path: &Path) -> std::io::Result<()> {
+        let past = SystemTime::now() - Duration::from_secs(60);
+        fs::File::open(path)?.set_modified(past)
+    }
+
+    fn key(tool: &str) -> CacheKey {
+        CacheKey {
+            tool: tool.to_string(),
+            arguments: String::new(),
+            files: Vec::new(),
+        }
+    }
+
+    #[test]
+    fn test_result_cache_evicts_least_recently_used() {
+        let cache = ResultCache::default();
+        for i in 0..CAPACITY {
+            cache.insert(key(&i.to_string()), i.to_string());
+        }
+
+        // Touching the oldest entry makes the second oldest the next to go
+        assert_eq!(cache.get(&key("0")).as_deref(), Some("0"));
+        cache.insert(key("new"), "new".to_string());
+
+        assert_eq!(cache.get(&key("0")).as_deref(), Some("0"));
+        assert_eq!(cache.get(&key("1")), None);
+        assert_eq!(cache.get(&key("new")).as_deref(), Some("new"));
+
+        // Replacing a result doesn't add a second recency slot
+        cache.insert(key("new"), "newer".to_string());
+        assert_eq!(cache.get(&key("new")).as_deref(), Some("newer"));
+        assert_eq!(cache.entries.lock().unwrap().order.len(), CAPACITY);
+    }
+
+    #[test]
+    fn test_cache_key_tracks_edits_creations_and_deletions() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let lib = temp_dir.path().join("lib.rs");
+        fs::write(&lib, "pub struct A;\n")?;
+        backdate(&lib)?;
+        backdate(temp_dir.path())?;
+
+        let globs = GlobCache::default();
+        let arguments = serde_json::json!({"paths": temp_dir.path()});
+        let original = CacheKey::new("find", &arguments, &globs).expect("settled files are cached");
+        assert_eq!(
+            CacheKey::new("find", &arguments, &globs),
+            Some(original.clone())
+        );
+        assert_ne!(
+            CacheKey::new("summary", &arguments, &globs),
+            Some(original.clone())
+        );
+
+        // Not cached while the edit is within mtime granularity
+        fs::write(&lib, "pub struct B;\n")?;
+        assert_eq!(CacheKey::new("find", &arguments, &globs), None);
+        backdate(&lib)?;
+        let edited = CacheKey::new("find", &arguments, &globs).expect("edit has settled");
+        assert_ne!(edited, original);
+
+        let new = temp_dir.path().join("new.rs");
+        fs::write(&new, "")?;
+        backdate(&new)?;
+        backdate(temp_dir.path())?;
+        let created = CacheKey::new("find", &arguments, &globs).expect("creation has settled");
+        assert_eq!(created.files.len(), 2);
+
+        fs::remove_file(&new)?;
+        backdate(temp_dir.path())?;
+        let deleted = CacheKey::new("find", &arguments, &globs).expect("deletion has settled");
+        assert_eq!(deleted.files.len(), 1);
+        assert_ne!(deleted, created);
+
+        assert_eq!(CacheKey::new("find", &serde_json::json!({}), &globs), None);
+        Ok(())
+    }
+
+    #[test]
+    fn test_glob_cache_sees_files_in_new_empty_directory() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let src = temp_dir.path().join("src");
+        let new_dir = src.join("new");
+        fs::create_dir_all(&new_dir)?;
+        fs::write(src.join("lib.rs"), "pub mod new;\n")?;
+        for path in [temp_dir.path(), &src, &new_dir, &src.join("lib.rs")] {
+            backdate(path)?;
+        }
+
+        let globs = GlobCache::default();
+        for pattern in [
+            src.display().to_string(),
+            format!("{}/**/*.rs", src.display()),
+        ] {
+            assert_eq!(globs.expand(&pattern)?, vec![src.join("lib.rs")]);
+            assert!(globs.entries.lock().unwrap().contains_key(&pattern));
+        }
+
+        // `src/new` held no Rust files when expanded, but was still stamped
+        fs::write(new_dir.join("mod.rs"), "pub fn f() {}\n")?;
+        for pattern in [
+            src.display().to_string(),
+            format!("{}/**/*.rs", src.display()),
+        ] {
+            let mut files = globs.expand(&pattern)?;
+            files.sort();
+            assert_eq!(files, vec![src.join("lib.rs"), new_dir.join("mod.rs")]);
+        }
+        Ok(())
+    }
+
+    #[test]
+    fn test_glob_cache_skips_recently_changed_directories() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        fs::write(temp_dir.path().join("lib.rs"), "")?;
+
+        let globs = GlobCache::default();
+        let pattern = temp_dir.path().display().to_string();
+        assert_eq!(globs.expand(&pattern)?.len(), 1);
+        assert!(globs.entries.lock().unwrap().is_empty());
+        Ok(())
+    }
+}
@@ -0,0 +1,265 @@
+//! Long-running `rs-hack serve` child shared by all tool calls.
+//!
+//! Spawning rs-hack per call pays process startup every time; the daemon
+//! pays it once. Each request runs on its own thread in the daemon, so
+//! nothing parsed outlives the call that parsed it.
+//! Requests are one JSON argv array per line. Each reply is a JSON header
+//! line `{"ok": bool, "stdout": N, "stderr": M}` followed by exactly N bytes
+//! of the command's stdout and M bytes of its stderr, so callers see the same
+//! output a one-shot process would have produced.
+
+use std::io::{BufRead, BufReader, Read, Write};
+use std::process::{Child, ChildStdin, ChildStdout, Command, Stdio};
+use std::sync::Mutex;
+
+use anyhow::{Result, anyhow};
+use serde::Deserialize;
+use tracing::{debug, warn};
+
+/// Captured result of one rs-hack command, however it was run.
+pub struct CliOutput {
+    pub success: bool,
+    pub stdout: Vec<u8>,
+    pub stderr: Vec<u8>,
+}
+
+/// Header line of a `rs-hack serve` reply.
+#[derive(Deserialize)]
+struct Reply {
+    ok: bool,
+    /// Byte lengths of the captured output that follows the header.
+    stdout: usize,
+    stderr: usize,
+}
+
+struct Session {
+    child: Child,
+    stdin: ChildStdin,
+    stdout: BufReader<ChildStdout>,
+    /// Whether this child has answered at least one request.
+    served: bool,
+}
+
+#[derive(Default)]
+enum State {
+    /// Not spawned yet, or the last child exited; spawn on next use.
+    #[default]
+    Idle,
+    Running(Session),
+    /// The installed rs-hack has no `serve` command; always spawn per call.
+    Unavailable,
+}
+
+#[derive(Default)]
+pub struct Daemon {
+    state: Mutex<State>,
+}
+
+impl Daemon {
+    /// Runs `rs-hack <command> <args>` on the daemon. Returns `None` when the
+    /// caller should spawn a one-shot process instead: the daemon is busy with
+    /// another call, or this rs-hack doesn't support `serve`.
+    pub fn run(&self, command: &str, args: &[String]) -> Option<Result<CliOutput>> {
+        // A busy daemon would serialize concurrent calls; spawning keeps them parallel
+        let mut state = self.state.try_lock().ok()?;
+
+        if matches!(*state, State::Idle) {
+            *state = match spawn() {
+                Ok(session) => State::Running(session),
+                Err(e) => {
+                    warn!("rs-hack serve unavailable, spawning per call: {}", e);
+                    State::Unavailable
+                }
+            };
+        }
+        let State::Running(session) = &mut *state else {
+            return None;
+        };
+
+        match request(&mut session.stdin, &mut session.stdout, command, args) {
+            Ok(output) => {
+                session.served = true;
+                Some(Ok(output))
+            }
+            Err(Failure { output_seen, error }) => {
+                let _ = session.child.kill();
+                let _ = session.child.wait();
+
+                if session.served || output_seen {
+                    // The command may have partly run (and written files), so
+                    // don't retry it; the next call starts a fresh daemon
+                    *state = State::Idle;
+                    Some(Err(error))
+                } else {
+                    debug!("rs-hack serve exited without a reply: {}", error);
+                    *state = State::Unavailable;
+                    None
+                }
+            }
+        }
+    }
+}
+
+impl Drop for Daemon {
+    fn drop(&mut self) {
+        if let Ok(State::Running(session)) = self.state.get_mut() {
+            let _ = session.child.kill();
+            let _ = session.child.wait();
+        }
+    }
+}
+
+struct Failure {
+    /// Whether the daemon produced any reply bytes before failing. A child
+    /// that dies silently on its first request doesn't support `serve`.
+    output_seen: bool,
+    error: anyhow::Error,
+}
+
+fn spawn() -> Result<Session> {
+    let mut child = Command::new("rs-hack")
+        .arg("serve")
+        .stdin(Stdio::piped())
+        .stdout(Stdio::piped())
+        .stderr(Stdio::null())
+        .spawn()
+        .map_err(|e| anyhow!("Failed to run rs-hack: {}. Is it installed?", e))?;
+
+    let stdin = child
+        .stdin
+        .take()
+        .ok_or_else(|| anyhow!("rs-hack serve: no stdin"))?;
+    let stdout = child
+        .stdout
+        .take()
+        .ok_or_else(|| anyhow!("rs-hack serve: no stdout"))?;
+    Ok(Session {
+        child,
+        stdin,
+        stdout: BufReader::new(stdout),
+        served: false,
+    })
+}
+
+/// Sends one argv line to `input` and reads its reply from `output`.
+fn request(
+    input: &mut impl Write,
+    output: &mut impl BufRead,
+    command: &str,
+    args: &[String],
+) -> Result<CliOutput, Failure> {
+    let fail = |output_seen: bool| {
+        move |e: std::io::Error| Failure {
+            output_seen,
+            error: e.into(),
+        }
+    };
+
+    let mut line = serde_json::to_vec(
+        &std::iter::once(command)
+            .chain(args.iter().map(String::as_str))
+            .collect::<Vec<_>>(),
+    )
+    .map_err(|e| Failure {
+        output_seen: false,
+        error: e.into(),
+    })?;
+    line.push(b'\n');
+    input.write_all(&line).map_err(fail(false))?;
+    input.flush().map_err(fail(false))?;
+
+    let mut header = String::new();
+    if output.read_line(&mut header).map_err(fail(false))? == 0 {
+        return Err(Failure {
+            output_seen: false,
+            error: anyhow!("rs-hack daemon exited unexpectedly"),
+        });
+    }
+    let reply: Reply = serde_json::from_str(&header).map_err(|e| Failure {
+        output_seen: true,
+        error: anyhow!("rs-hack daemon sent a malformed reply: {}", e),
+    })?;
+
+    let mut stdout = vec![0; reply.stdout];
+    let mut stderr = vec![0; reply.stderr];
+    output.read_exact(&mut stdout).map_err(fail(true))?;
+    output.read_exact(&mut stderr).map_err(fail(true))?;
+
+    Ok(CliOutput {
+        success: reply.ok,
+        stdout,
+        stderr,
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use std::io::Cursor;
+
+    use super::*;
+
+    fn args(args: &[&str]) -> Vec<String> {
+        args.iter().map(|a| a.to_string()).collect()
+    }
+
+    #[test]
+    fn test_request_reads_length_prefixed_reply() {
+        let mut sent = Vec::new();
+        // Payloads may hold newlines; only the header is line-delimited
+        let mut replies = Cursor::new(
+            b"{\"ok\":true,\"stdout\":6,\"stderr\":3}\na\nb\nc\nw\n\n\
+              {\"ok\":false,\"stdout\":0,\"stderr\":4}\nbad\n"
+                .to_vec(),
+        );
+
+        let Ok(first) = request(&mut sent, &mut replies, "find", &args(&["--paths", "src"])) else {
+            panic!("expected a reply");
+        };
+        assert!(first.success);
+        assert_eq!(first.stdout, b"a\nb\nc\n");
+        assert_eq!(first.stderr, b"w\n\n");
+
+        let Ok(second) = request(&mut sent, &mut replies, "history", &[]) else {
+            panic!("expected a reply");
+        };
+        assert!(!second.success);
+        assert!(second.stdout.is_empty());
+        assert_eq!(second.stderr, b"bad\n");
+
+        assert_eq!(
+            String::from_utf8(sent).unwrap(),
+            "[\"find\",\"--paths\",\"src\"]\n[\"history\"]\n"
+        );
+    }
+
+    #[test]
+    fn test_request_failures_report_whether_output_was_seen() {
+        let cases: [(&[u8], bool); 3] = [
+            // Exited before replying: `serve` may be unsupported
+            (b"", false),
+            (b"usage: rs-hack <COMMAND>\n", true),
+            // Died partway through the payload
+            (b"{\"ok\":true,\"stdout\":10,\"stderr\":0}\nshort", true),
+        ];
+
+        for (reply, expected) in cases {
+            let Err(failure) = request(&mut Vec::new(), &mut Cursor::new(reply), "find", &[])
+            else {
+                panic!("expected a failure for {:?}", reply);
+            };
+            assert_eq!(failure.output_seen, expected, "{}", failure.error);
+        }
+    }
+
+    #[test]
+    fn test_daemon_falls_back_when_unavailable_or_busy() {
+        let unavailable = Daemon {
+            state: Mutex::new(State::Unavailable),
+        };
+        assert!(unavailable.run("find", &[]).is_none());
+
+        let busy = Daemon::default();
+        let _held = busy.state.lock().unwrap();
+        assert!(busy.run("find", &[]).is_none());
+    }
+}
@@ -1,5 +1,7 @@
 //! MCP module: protocol types, server loop, and tool registry.
 
+mod cache;
+mod daemon;
 mod protocol;
 mod server;
 mod tools;
@@ -1,52 +1,105 @@
 //! MCP server: stdio-based JSON-RPC loop that handles initialize,
 //! tools/list, and tools/call methods.
 
-use std::io::{BufRead, Write};
+use std::sync::Arc;
 
 use anyhow::Result;
-use serde_json::{Value, json};
+use serde_json::{Map, Value, json};
+use tokio::io::{AsyncBufReadExt, AsyncWriteExt, BufReader};
+use tokio::sync::mpsc;
 use tracing::{debug, error, info};
 
 use super::protocol::{JsonRpcRequest, JsonRpcResponse};
 use super::tools::ToolRegistry;
 
 pub struct Server {
-    tools: ToolRegistry,
+    tools: Arc<ToolRegistry>,
 }
 
 impl Server {
     pub fn new() -> Self {
         Self {
-            tools: ToolRegistry::new(),
+            tools: Arc::new(ToolRegistry::new()),
         }
     }
 
-    pub fn run(self) -> Result<()> {
-        let stdin = std::io::stdin();
-        let mut stdout = std::io::stdout();
-        let reader = stdin.lock();
+    /// Serve requests from stdin until it closes.
+    ///
+    /// `tools/call` requests run on the blocking pool, so a slow rs-hack
+    /// invocation doesn't hold up the calls queued behind it. Responses are
+    /// written as they complete; clients match them to requests by id.
+    /// Calls that write are serialized by the registry.
+    pub async fn run(self) -> Result<()> {
+        let mut stdin = BufReader::new(tokio::io::stdin());
+        let (tx, mut rx) = mpsc::unbounded_channel::<JsonRpcResponse>();
+
+        let writer = tokio::spawn(async move {
+            let mut stdout = tokio::io::stdout();
+            // One encode buffer for the whole session, serialized into
+            // directly rather than via an intermediate String per response
+            let mut buf = Vec::new();
+            while let Some(response) = rx.recv().await {
+                buf.clear();
+                serde_json::to_writer(&mut buf, &response)?;
+                debug!("Sending: {}", String::from_utf8_lossy(&buf));
+                buf.push(b'\n');
+                stdout.write_all(&buf).await?;
+                stdout.flush().await?;
+            }
+            Ok::<(), anyhow::Error>(())
+        });
 
         info!("MCP server ready, waiting for requests");
 
-        for line in reader.lines() {
-            let line = line?;
-            if line.trim().is_empty() {
+        // Requests are parsed straight from the raw bytes of each line, read
+        // into one buffer reused for the whole session
+        let mut line = Vec::new();
+        loop {
+            line.clear();
+            if stdin.read_until(b'\n', &mut line).await? == 0 {
+                break;
+            }
+            if line.trim_ascii().is_empty() {
                 continue;
             }
 
-            debug!("Received: {}", line);
-
-            let response = match serde_json::from_str::<JsonRpcRequest>(&line) {
-                Ok(request) => self.handle_request(request),
-                Err(e) => JsonRpcResponse::error(None, -32700, format!("Parse error: {e}")),
-            };
-
-            let response_json = serde_json::to_string(&response)?;
-            debug!("Sending: {}", response_json);
-            writeln!(stdout, "{response_json}")?;
-            stdout.flush()?;
+            debug!("Received: {}", String::from_utf8_lossy(&line));
+
+            match serde_json::from_slice::<JsonRpcRequest>(&line) {
+                Ok(request) if request.method == "tools/call" => {
+                    let tools = Arc::clone(&self.tools);
+                    let tx = tx.clone();
+                    let id = request.id.clone();
+                    let call = tokio::task::spawn_blocking(move || {
+                        Self::handle_tools_call(&tools, request)
+                    });
+                    // A panicking tool still owes the client a response
+                    tokio::spawn(async move {
+                        let response = call.await.unwrap_or_else(|e| {
+                            error!("Tool call panicked: {}", e);
+                            JsonRpcResponse::internal_error(id, "Tool call panicked".to_string())
+                        });
+                        let _ = tx.send(response);
+                    });
+                }
+                Ok(request) => {
+                    let _ = tx.send(self.handle_request(request));
+                }
+                Err(e) => {
+                    let _ = tx.send(JsonRpcResponse::error(
+                        None,
+                        -32700,
+                        format!("Parse error: {e}"),
+                    ));
+                }
+            }
         }
 
+        // Stdin closed. In-flight calls still hold a sender, so the writer
+        // drains their responses before it exits.
+        drop(tx);
+        writer.await??;
+
         Ok(())
     }
 
@@ -56,7 +109,7 @@ impl Server {
         match request.method.as_str() {
             "initialize" => Self::handle_initialize(request),
             "tools/list" => self.handle_tools_list(request),
-            "tools/call" => self.handle_tools_call(request),
+            "tools/call" => Self::handle_tools_call(&self.tools, request),
             _ => JsonRpcResponse::method_not_found(request.id),
         }
     }
@@ -79,10 +132,12 @@ impl Server {
                 - Operations are idempotent - safe to run multiple times\n\
                 - Use inspect tools first to see what will be affected\n\
                 - All operations support glob patterns for multi-file edits\n\
-                - Changes are tracked with unique run IDs for easy revert\n\n\
+                - Changes are tracked with unique run IDs for easy revert\n\
+                - For several edits to the same files, use apply_plan instead of chained \
+                calls: each file is parsed and written once, and one revert undoes the plan\n\n\
                 Workflow:\n\
                 1. Use inspect_* tools to explore code\n\
-                2. Preview changes (dry-run)\n\
+                2. Preview changes (dry-run), batching related edits into one apply_plan\n\
                 3. Apply changes with apply=true\n\
                 4. Use history/revert if needed"
         });
@@ -109,10 +164,10 @@ impl Server {
         JsonRpcResponse::success(request.id, json!({ "tools": tools_list }))
     }
 
-    fn handle_tools_call(&self, request: JsonRpcRequest) -> JsonRpcResponse {
-        let params = match request.params {
-            Some(p) => p,
-            None => {
+    fn handle_tools_call(tools: &ToolRegistry, request: JsonRpcRequest) -> JsonRpcResponse {
+        let mut params = match request.params {
+            Some(Value::Object(p)) => p,
+            _ => {
                 return JsonRpcResponse::invalid_params(
                     request.id.clone(),
                     "Missing params".to_string(),
@@ -120,6 +175,9 @@ impl Server {
             }
         };
 
+        // Take the arguments out of the request instead of cloning them
+        let arguments = params.remove("arguments").unwrap_or_else(|| json!({}));
+
         let tool_name = match params.get("name").and_then(|v| v.as_str()) {
             Some(name) => name,
             None => {
@@ -130,20 +188,12 @@ impl Server {
             }
         };
 
-        let arguments = params
-            .get("arguments")
-            .cloned()
-            .unwrap_or_else(|| json!({}));
-
         debug!("Calling tool: {} with args: {:?}", tool_name, arguments);
 
-        match self.tools.call(tool_name, arguments) {
+        match tools.call(tool_name, arguments) {
             Ok(result) => {
                 info!("Tool {} completed successfully", tool_name);
-                JsonRpcResponse::success(
-                    request.id,
-                    json!({ "content": [{ "type": "text", "text": result }] }),
-                )
+                JsonRpcResponse::success(request.id, text_content(result))
             }
             Err(e) => {
                 error!("Tool {} failed: {}", tool_name, e);
@@ -152,3 +202,19 @@ impl Server {
         }
     }
 }
+
+/// `{"content": [{"type": "text", "text": text}]}`, built by hand: `json!`
+/// serializes interpolated values by reference, which would copy what can
+/// be a multi-megabyte tool result.
+fn text_content(text: String) -> Value {
+    let mut item = Map::new();
+    item.insert("type".to_string(), Value::from("text"));
+    item.insert("text".to_string(), Value::String(text));
+
+    let mut result = Map::new();
+    result.insert(
+        "content".to_string(),
+        Value::Array(vec![Value::Object(item)]),
+    );
+    Value::Object(result)
+}
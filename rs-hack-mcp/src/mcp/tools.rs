@@ -1,12 +1,22 @@
 //! Tool registry: defines MCP tool schemas and executes them
 //! by shelling out to the rs-hack CLI binary.
 
-use std::process::Command;
+use std::collections::HashSet;
+use std::io::Write;
+use std::process::{Command, Stdio};
+use std::sync::{Mutex, PoisonError};
 
 use anyhow::{Result, anyhow};
+use rs_hack::commands::find::FindQuery;
+use serde::de::IgnoredAny;
+use serde::{Deserialize, Deserializer, Serialize};
 use serde_json::{Value, json};
 use tracing::debug;
 
+use self::ArgSpec::{Fixed, IfFalse, KindOrNodeType, Number, Positional, Str, Switch};
+use super::cache::{CacheKey, GlobCache, ResultCache};
+use super::daemon::{CliOutput, Daemon};
+
 #[derive(Debug, Clone)]
 pub struct Tool {
     pub name: &'static str,
@@ -16,14 +26,21 @@ pub struct Tool {
 
 pub struct ToolRegistry {
     tools: Vec<Tool>,
+    /// Tools with an `apply` flag; their dry-run output gets a reminder.
+    dry_run: HashSet<&'static str>,
+    cache: ResultCache,
+    globs: GlobCache,
+    daemon: Daemon,
+    /// Held by calls that write sources or run state, one at a time.
+    writes: Mutex<()>,
 }
 
 impl ToolRegistry {
     pub fn new() -> Self {
-        Self {
+        let mut registry = Self {
             tools: vec![
                 // ============================================================
-                // INSPECTION TOOLS (1)
+                // INSPECTION TOOLS (2)
                 // ============================================================
                 Tool {
                     name: "find",
@@ -42,13 +59,43 @@ impl ToolRegistry {
                             "content_filter": {"type": "string", "description": "Filter by content substring"},
                             "field_name": {"type": "string", "description": "Find all occurrences of a field across struct definitions, enum variants, and struct literals"},
                             "include_comments": {"type": "boolean", "default": true, "description": "Include preceding comments (doc and regular) in output"},
-                            "format": {"type": "string", "enum": ["snippets", "locations", "json"], "default": "snippets"},
+                            "format": {"type": "string", "enum": ["snippets", "locations", "json", "json-soa"], "default": "snippets", "description": "locations: one file:line:col per line, no snippets. json-soa: one array per attribute (file_paths, lines, columns, end_lines, ...) plus a kind tag, instead of one object per match."},
                             "limit": {"type": "integer", "description": "Limit number of results (like 'head -N')"},
-                            "context": {"type": "integer", "description": "v0.5.5: prepend N raw lines before each snippet match, like 'grep -B N'"}
+                            "context": {"type": "integer", "description": "v0.5.5: prepend N raw lines before each snippet match, like 'grep -B N'"},
+                            "parallel": {"type": "boolean", "default": false, "description": "Shard files across worker threads (all cores but two). Worth it for broad globs over large trees."}
                         },
                         "required": ["paths"]
                     }),
                 },
+                Tool {
+                    name: "find_batch",
+                    description: "Run several find queries over the same paths in one call. Each file is read and parsed once for the whole batch, so chaining inspections (struct literals, then match arms, then enum usages) costs one parse instead of one per query. Returns a JSON array with one result per query, in order.",
+                    input_schema: json!({
+                        "type": "object",
+                        "properties": {
+                            "paths": {"type": "string", "description": "File path or glob pattern (e.g., \"src/**/*.rs\")"},
+                            "queries": {
+                                "type": "array",
+                                "description": "Queries to evaluate; each takes the same filters as `find`",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "node_type": {"type": "string", "description": "Type of AST node (see `find`). Omit to search all types."},
+                                        "kind": {"type": "string", "description": "Semantic kind (struct, function, enum, ...). Mutually exclusive with node_type."},
+                                        "name": {"type": "string", "description": "Optional name filter"},
+                                        "variant": {"type": "string", "description": "Filter enum variants by name"},
+                                        "content_filter": {"type": "string", "description": "Filter by content substring"},
+                                        "field_name": {"type": "string", "description": "Find all occurrences of a field"},
+                                        "include_comments": {"type": "boolean", "default": true}
+                                    }
+                                }
+                            },
+                            "parallel": {"type": "boolean", "default": false, "description": "Shard files across worker threads (all cores but two)"},
+                            "limit": {"type": "integer", "description": "Cap matches per query; scanning stops once every query has this many"}
+                        },
+                        "required": ["paths", "queries"]
+                    }),
+                },
                 // ============================================================
                 // UNIFIED CRUD TOOLS (4) - v0.5.0
                 // These replace 17 legacy hyphenated commands with semantic operations
@@ -146,6 +193,7 @@ impl ToolRegistry {
                             "function_path": {"type": "string", "description": "Module path for function (optional)"},
                             "edit_mode": {"type": "string", "enum": ["surgical", "reformat"], "default": "surgical", "description": "Edit mode: surgical (preserves formatting, default) or reformat"},
                             "validate": {"type": "boolean", "default": true, "description": "Validate with cargo check"},
+                            "parallel": {"type": "boolean", "default": false, "description": "Rewrite files on worker threads (all cores but two). Worth it for broad renames over large trees; recorded as one run either way."},
                             "apply": {"type": "boolean", "default": false, "description": "Apply changes (default is dry-run)"}
                         },
                         "required": ["paths", "name", "to"]
@@ -161,8 +209,8 @@ impl ToolRegistry {
                         "type": "object",
                         "properties": {
                             "paths": {"type": "string"},
-                            "node_type": {"type": "string", "enum": ["macro-call", "method-call", "function-call", "enum-usage", "struct-literal", "match-arm", "identifier", "type-ref"]},
-                            "action": {"type": "string", "enum": ["comment", "remove", "replace"]},
+                            "node_type": {"type": "string", "description": "Any node type `inspect` accepts (e.g. macro-call, method-call, struct-literal, match-arm)"},
+                            "action": {"type": "string", "enum": TRANSFORM_ACTIONS.map(|(action, _)| action)},
                             "name": {"type": "string"},
                             "content_filter": {"type": "string"},
                             "with": {"type": "string", "description": "Replacement code (required if action=replace)"},
@@ -186,6 +234,23 @@ impl ToolRegistry {
                         "required": ["spec"]
                     }),
                 },
+                Tool {
+                    name: "apply_plan",
+                    description: "Apply several edits in one call. Each file under `paths` is parsed once, every step is applied in order to the same AST, and the file is written once; an applied plan is recorded as one run (one revert undoes it all). Prefer this over chaining add/update/rename calls on the same files. Steps use the batch operation format, e.g. {\"type\": \"AddDerive\", \"target_name\": \"User\", \"target_type\": \"struct\", \"derives\": [\"Clone\"]} or {\"type\": \"AddStructField\", \"struct_name\": \"User\", \"field_def\": \"email: String\", \"position\": \"Last\"}.",
+                    input_schema: json!({
+                        "type": "object",
+                        "properties": {
+                            "paths": {"type": "string", "description": "File path, directory, or glob pattern (e.g., \"src/**/*.rs\")"},
+                            "steps": {
+                                "type": "array",
+                                "description": "Operations to apply in order; each has a \"type\" (AddStructField, AddDerive, AddEnumVariant, RenameEnumVariant, Transform, ...) plus that operation's fields",
+                                "items": {"type": "object", "properties": {"type": {"type": "string"}}, "required": ["type"]}
+                            },
+                            "apply": {"type": "boolean", "default": false}
+                        },
+                        "required": ["paths", "steps"]
+                    }),
+                },
                 Tool {
                     name: "history",
                     description: "Show history of rs-hack operations",
@@ -220,8 +285,8 @@ impl ToolRegistry {
                 },
                 // ============================================================
                 // DISCOVERY COMMANDS (5) - v0.5.5
-                // Read-only summary/audit views over the AST. Each shells out
-                // to the matching CLI subcommand.
+                // Read-only summary/audit views over the AST. Each runs
+                // in-process against the matching `rs_hack::commands` module.
                 // ============================================================
                 Tool {
                     name: "impls",
@@ -282,7 +347,21 @@ impl ToolRegistry {
                     }),
                 },
             ],
-        }
+            dry_run: HashSet::new(),
+            cache: ResultCache::default(),
+            globs: GlobCache::default(),
+            daemon: Daemon::default(),
+            writes: Mutex::new(()),
+        };
+
+        // Resolved once from the schemas rather than matched by name per call
+        registry.dry_run = registry
+            .tools
+            .iter()
+            .filter(|tool| tool.input_schema["properties"].get("apply").is_some())
+            .map(|tool| tool.name)
+            .collect();
+        registry
     }
 
     pub fn list(&self) -> &[Tool] {
@@ -292,47 +371,115 @@ impl ToolRegistry {
     pub fn call(&self, name: &str, arguments: Value) -> Result<String> {
         debug!("Executing tool: {} with args: {:?}", name, arguments);
 
+        // Read-only tools and dry runs are deterministic in the scanned
+        // sources, so repeats are served from the cache until a file changes.
+        let cache_key = if Self::is_cacheable(name, &arguments) {
+            CacheKey::new(name, &arguments, &self.globs)
+        } else {
+            None
+        };
+
+        if let Some(key) = &cache_key
+            && let Some(hit) = self.cache.get(key)
+        {
+            debug!("Cache hit for tool: {}", name);
+            return Ok(hit);
+        }
+
+        // Mutating calls share source files, runs.json and its temp file, so
+        // they run one at a time; reads and dry runs stay concurrent
+        let _write_guard = Self::is_mutating(name, &arguments)
+            .then(|| self.writes.lock().unwrap_or_else(PoisonError::into_inner));
+        let result = self.run_tool(name, &arguments)?;
+
+        // A revert can restore files that a cached expansion no longer lists.
+        if name == "revert" {
+            self.globs.invalidate();
+        }
+
+        if let Some(key) = cache_key {
+            self.cache.insert(key, result.clone());
+        }
+
+        Ok(result)
+    }
+
+    /// Calls whose output depends only on the files under `paths`. Excludes
+    /// anything that writes, reads run state, or lists non-Rust files.
+    fn is_cacheable(name: &str, arguments: &Value) -> bool {
+        !matches!(name, "history" | "revert" | "clean" | "batch" | "neighbors")
+            && !arguments
+                .get("apply")
+                .and_then(|v| v.as_bool())
+                .unwrap_or(false)
+    }
+
+    /// Calls that write sources or run state.
+    fn is_mutating(name: &str, arguments: &Value) -> bool {
+        matches!(name, "revert" | "clean" | "batch" | "apply_plan")
+            || arguments
+                .get("apply")
+                .and_then(|v| v.as_bool())
+                .unwrap_or(false)
+    }
+
+    fn run_tool(&self, name: &str, arguments: &Value) -> Result<String> {
         // In-process dispatch for tools backed by the rs-hack lib API.
         // Returns serialized JSON; bypasses argv → CLI → stdout marshalling.
         if name == "find" {
-            return Self::call_find_inproc(&arguments);
+            return self.call_find_inproc(arguments);
+        }
+        if name == "find_batch" {
+            return self.call_find_batch_inproc(arguments);
+        }
+        if matches!(
+            name,
+            "impls" | "match_audit" | "doc_coverage" | "summary" | "neighbors"
+        ) {
+            return self.call_discovery_inproc(name, arguments);
+        }
+
+        // Reject bad transforms here rather than after a round trip to rs-hack
+        if name == "transform" {
+            check_transform(arguments)?;
         }
 
         // Map tool name to rs-hack command and build arguments
-        let (command, args) = self.build_command(name, &arguments)?;
+        let (command, args) = self.build_command(name, arguments)?;
+        let stdin = if name == "apply_plan" {
+            Some(plan_spec(arguments)?)
+        } else {
+            None
+        };
 
         debug!("Running: rs-hack {} {}", command, args.join(" "));
 
-        let output = Command::new("rs-hack")
-            .arg(&command)
-            .args(&args)
-            .output()
-            .map_err(|e| anyhow!("Failed to run rs-hack: {}. Is it installed?", e))?;
+        // Plans go over stdin, which the daemon uses for its own requests
+        let daemon_output = match stdin {
+            None => self.daemon.run(&command, &args),
+            Some(_) => None,
+        };
+        let output = match daemon_output {
+            Some(output) => output?,
+            None => run_rs_hack(&command, &args, stdin.as_deref())?,
+        };
 
-        if output.status.success() {
-            let stdout = String::from_utf8_lossy(&output.stdout);
-            let result = stdout.trim().to_string();
+        if output.success {
+            // Valid UTF-8 (the common case) is taken over without a copy
+            let mut result = String::from_utf8(output.stdout)
+                .unwrap_or_else(|e| String::from_utf8_lossy(e.as_bytes()).into_owned());
+            trim_in_place(&mut result);
 
             // If operation completed and apply was false, add reminder
-            // (skip for read-only tools that don't have an apply parameter)
-            let is_read_only = matches!(
-                name,
-                "find"
-                    | "history"
-                    | "impls"
-                    | "match_audit"
-                    | "doc_coverage"
-                    | "summary"
-                    | "neighbors"
-            );
-            if !is_read_only && !self.get_bool(&arguments, "apply") && !result.is_empty() {
-                Ok(format!(
-                    "{}\n\n💡 This was a DRY RUN. Use apply=true to make actual changes.",
-                    result
-                ))
-            } else {
-                Ok(result)
+            // (only for tools that have an apply parameter)
+            if self.dry_run.contains(name)
+                && !self.get_bool(arguments, "apply")
+                && !result.is_empty()
+            {
+                result
+                    .push_str("\n\n💡 This was a DRY RUN. Use apply=true to make actual changes.");
             }
+            Ok(result)
         } else {
             let stderr = String::from_utf8_lossy(&output.stderr);
             Err(anyhow!("rs-hack failed: {}", stderr))
@@ -340,230 +487,106 @@ impl ToolRegistry {
     }
 
     /// In-process `find`: builds `FindArgs` from the JSON tool arguments,
-    /// calls the rs-hack lib, returns serialized matches. The `format` field
-    /// in the schema is honored by always returning JSON — agent consumers
-    /// of the MCP server want structured data, not the CLI's grouped/snippet
-    /// rendering.
-    fn call_find_inproc(arguments: &Value) -> Result<String> {
-        use std::path::PathBuf;
-
+    /// calls the rs-hack lib, returns serialized matches. `locations` returns
+    /// `file:line:col` lines and `json-soa` the column-wise form; any other
+    /// `format` returns per-match JSON — agent consumers of the MCP server
+    /// want structured data, not the CLI's grouped/snippet rendering.
+    fn call_find_inproc(&self, arguments: &Value) -> Result<String> {
         use rs_hack::commands::find::{FindArgs, run};
 
-        let str_arg = |k: &str| -> Option<String> {
-            arguments.get(k).and_then(|v| v.as_str()).map(String::from)
-        };
-
-        let paths: Vec<PathBuf> = arguments
-            .get("paths")
-            .and_then(|v| v.as_str())
-            .map(|s| vec![PathBuf::from(s)])
-            .ok_or_else(|| anyhow!("find: 'paths' is required"))?;
-
-        let include_comments = arguments
-            .get("include_comments")
-            .and_then(|v| v.as_bool())
-            .unwrap_or(true);
-
+        let params: FindParams = decode("find", arguments)?;
+        let locations_only = params.format == Some("locations");
         let args = FindArgs {
-            paths,
+            paths: self.globs.expand(params.paths)?,
             exclude: Vec::new(),
-            kind: str_arg("kind"),
-            node_type: str_arg("node_type"),
-            name: str_arg("name"),
-            variant: str_arg("variant"),
-            content_filter: str_arg("content_filter"),
-            field_name: str_arg("field_name"),
-            include_comments,
-            context: arguments
-                .get("context")
-                .and_then(|v| v.as_u64())
-                .map(|n| n as usize),
+            kind: params.kind,
+            node_type: params.node_type,
+            name: params.name,
+            variant: params.variant,
+            content_filter: params.content_filter,
+            field_name: params.field_name,
+            // Comments are never shown in locations output
+            include_comments: params.include_comments.unwrap_or(true) && !locations_only,
+            context: params.context,
+            parallel: params.parallel.unwrap_or(false),
+            limit: params.limit,
         };
 
         let result = run(&args)?;
-        Ok(serde_json::to_string_pretty(&result)?)
+        match params.format {
+            Some("locations") => Ok(result.into_columns(false).locations()),
+            Some("json-soa") => Ok(serde_json::to_string_pretty(&result.into_columns(true))?),
+            _ => Ok(serde_json::to_string_pretty(&result)?),
+        }
     }
 
-    fn build_command(&self, tool_name: &str, arguments: &Value) -> Result<(String, Vec<String>)> {
-        let mut args = Vec::new();
-
-        // Map tool names to actual rs-hack commands
-        let command = match tool_name {
-            // Find uses "find" command
-            "find" => {
-                self.add_find_args(arguments, &mut args);
-                "find"
-            }
-            // Unified CRUD commands (v0.5.0)
-            "add" => {
-                self.add_add_args(arguments, &mut args);
-                "add"
-            }
-            "remove" => {
-                self.add_remove_args(arguments, &mut args);
-                "remove"
-            }
-            "update" => {
-                self.add_update_args(arguments, &mut args);
-                "update"
-            }
-            "rename" => {
-                self.add_rename_args(arguments, &mut args);
-                "rename"
-            }
-            // Transform command
-            "transform" => {
-                self.add_transform_args(arguments, &mut args)?;
-                "transform"
-            }
-            // History renamed to "history"
-            "history" => {
-                if let Some(limit) = arguments.get("limit").and_then(|v| v.as_i64()) {
-                    args.push("--limit".to_string());
-                    args.push(limit.to_string());
-                }
-                "history"
-            }
-            // Revert
-            "revert" => {
-                if let Some(run_id) = arguments.get("run_id").and_then(|v| v.as_str()) {
-                    args.push(run_id.to_string());
-                }
-                if self.get_bool(arguments, "force") {
-                    args.push("--force".to_string());
-                }
-                "revert"
-            }
-            // Clean
-            "clean" => {
-                if let Some(days) = arguments.get("keep_days").and_then(|v| v.as_i64()) {
-                    args.push("--keep-days".to_string());
-                    args.push(days.to_string());
-                }
-                "clean"
-            }
-            // Batch
-            "batch" => {
-                if let Some(spec) = arguments.get("spec").and_then(|v| v.as_str()) {
-                    args.push("--spec".to_string());
-                    args.push(spec.to_string());
-                }
-                if self.get_bool(arguments, "apply") {
-                    args.push("--apply".to_string());
-                }
-                "batch"
-            }
-            // All other commands map 1:1 (with underscores -> dashes)
-            _ => {
-                self.add_standard_args(arguments, &mut args);
-                &tool_name.replace('_', "-")
-            }
+    /// In-process `find_batch`: one file walk and one parse per file for all
+    /// queries. Returns a JSON array of results in query order.
+    fn call_find_batch_inproc(&self, arguments: &Value) -> Result<String> {
+        use rs_hack::commands::find::{BatchFindArgs, run_batch};
+
+        let params: FindBatchParams = decode("find_batch", arguments)?;
+        let args = BatchFindArgs {
+            paths: self.globs.expand(params.paths)?,
+            exclude: Vec::new(),
+            queries: params.queries,
+            parallel: params.parallel.unwrap_or(false),
+            limit: params.limit,
         };
 
-        Ok((command.to_string(), args))
+        let results = run_batch(&args)?;
+        Ok(serde_json::to_string_pretty(&results)?)
     }
 
-    fn add_find_args(&self, arguments: &Value, args: &mut Vec<String>) {
-        // Add paths
-        if let Some(paths) = arguments.get("paths").and_then(|v| v.as_str()) {
-            args.push("--paths".to_string());
-            args.push(paths.to_string());
-        }
-
-        // Add node-type
-        if let Some(node_type) = arguments.get("node_type").and_then(|v| v.as_str()) {
-            args.push("--node-type".to_string());
-            args.push(node_type.to_string());
-        }
-
-        // Add name filter
-        if let Some(name) = arguments.get("name").and_then(|v| v.as_str()) {
-            args.push("--name".to_string());
-            args.push(name.to_string());
-        }
-
-        // Add variant filter (for enum variant filtering)
-        if let Some(variant) = arguments.get("variant").and_then(|v| v.as_str()) {
-            args.push("--variant".to_string());
-            args.push(variant.to_string());
-        }
+    /// In-process discovery tools. Renders the same text the CLI prints, via
+    /// each report's `Display` impl, without spawning `rs-hack`.
+    fn call_discovery_inproc(&self, name: &str, arguments: &Value) -> Result<String> {
+        use std::path::{Path, PathBuf};
 
-        // Add content filter
-        if let Some(content) = arguments.get("content_filter").and_then(|v| v.as_str()) {
-            args.push("--content-filter".to_string());
-            args.push(content.to_string());
-        }
+        use rs_hack::commands::{doc_coverage, impls, match_audit, neighbors, summary};
 
-        // Add include_comments (default is true, only add flag if explicitly set to false)
-        if let Some(include_comments) = arguments.get("include_comments").and_then(|v| v.as_bool())
-            && !include_comments
-        {
-            args.push("--include-comments".to_string());
-            args.push("false".to_string());
-        }
-
-        // Add format
-        if let Some(format) = arguments.get("format").and_then(|v| v.as_str()) {
-            args.push("--format".to_string());
-            args.push(format.to_string());
-        }
+        let params: DiscoveryParams = decode(name, arguments)?;
+        let required = |value: Option<&str>, key: &str| -> Result<&str> {
+            value.ok_or_else(|| anyhow!("{}: '{}' is required", name, key))
+        };
+        let paths =
+            || -> Result<Vec<PathBuf>> { self.globs.expand(required(params.paths, "paths")?) };
 
-        // Add field_name (for field finding)
-        if let Some(field_name) = arguments.get("field_name").and_then(|v| v.as_str()) {
-            args.push("--field-name".to_string());
-            args.push(field_name.to_string());
-        }
+        let mut report = match name {
+            "impls" => {
+                impls::run(&paths()?, required(params.trait_name, "trait")?, &[])?.to_string()
+            }
+            "match_audit" => {
+                match_audit::run(&paths()?, required(params.enum_name, "enum")?, &[])?.to_string()
+            }
+            "doc_coverage" => {
+                doc_coverage::run(&paths()?, params.fields.unwrap_or(false), &[])?.to_string()
+            }
+            "summary" => summary::run(&PathBuf::from(required(params.path, "path")?))?.to_string(),
+            "neighbors" => neighbors::run(Path::new(required(params.path, "path")?))?.to_string(),
+            _ => return Err(anyhow!("Unknown discovery tool: {}", name)),
+        };
 
-        // Add limit (for result limiting)
-        if let Some(limit) = arguments.get("limit").and_then(|v| v.as_i64()) {
-            args.push("--limit".to_string());
-            args.push(limit.to_string());
-        }
+        trim_in_place(&mut report);
+        Ok(report)
     }
 
-    fn add_transform_args(&self, arguments: &Value, args: &mut Vec<String>) -> Result<()> {
-        // Add paths
-        if let Some(paths) = arguments.get("paths").and_then(|v| v.as_str()) {
-            args.push("--paths".to_string());
-            args.push(paths.to_string());
-        }
-
-        // Add node-type
-        if let Some(node_type) = arguments.get("node_type").and_then(|v| v.as_str()) {
-            args.push("--node-type".to_string());
-            args.push(node_type.to_string());
-        }
-
-        // Add action
-        if let Some(action) = arguments.get("action").and_then(|v| v.as_str()) {
-            args.push("--action".to_string());
-            args.push(action.to_string());
-        }
-
-        // Add name
-        if let Some(name) = arguments.get("name").and_then(|v| v.as_str()) {
-            args.push("--name".to_string());
-            args.push(name.to_string());
-        }
-
-        // Add content-filter
-        if let Some(content) = arguments.get("content_filter").and_then(|v| v.as_str()) {
-            args.push("--content-filter".to_string());
-            args.push(content.to_string());
-        }
-
-        // Add with (replacement)
-        if let Some(with) = arguments.get("with").and_then(|v| v.as_str()) {
-            args.push("--with".to_string());
-            args.push(with.to_string());
-        }
+    fn build_command(&self, tool_name: &str, arguments: &Value) -> Result<(String, Vec<String>)> {
+        // Tools with a fixed flag table; everything else maps 1:1 (with
+        // underscores -> dashes)
+        let Some((_, command, specs)) = COMMANDS.iter().find(|(tool, ..)| *tool == tool_name)
+        else {
+            let mut args = Vec::new();
+            self.add_standard_args(arguments, &mut args);
+            return Ok((tool_name.replace('_', "-"), args));
+        };
 
-        // Add apply
-        if self.get_bool(arguments, "apply") {
-            args.push("--apply".to_string());
+        let mut args = Vec::with_capacity(specs.len() * 2);
+        for spec in *specs {
+            spec.push(arguments, &mut args);
         }
 
-        Ok(())
+        Ok((command.to_string(), args))
     }
 
     fn add_standard_args(&self, arguments: &Value, args: &mut Vec<String>) {
@@ -605,315 +628,472 @@ impl ToolRegistry {
             .and_then(|v| v.as_bool())
             .unwrap_or(false)
     }
+}
 
-    // ============================================================
-    // Unified CRUD command argument builders (v0.5.0)
-    // ============================================================
-
-    fn add_add_args(&self, arguments: &Value, args: &mut Vec<String>) {
-        // Add paths (required)
-        if let Some(paths) = arguments.get("paths").and_then(|v| v.as_str()) {
-            args.push("--paths".to_string());
-            args.push(paths.to_string());
-        }
-
-        // Add name (optional for some operations like --use)
-        if let Some(name) = arguments.get("name").and_then(|v| v.as_str()) {
-            args.push("--name".to_string());
-            args.push(name.to_string());
-        }
-
-        // Add kind or node-type (mutually exclusive)
-        if let Some(kind) = arguments.get("kind").and_then(|v| v.as_str()) {
-            args.push("--kind".to_string());
-            args.push(kind.to_string());
-        } else if let Some(node_type) = arguments.get("node_type").and_then(|v| v.as_str()) {
-            args.push("--node-type".to_string());
-            args.push(node_type.to_string());
-        }
-
-        // Add field
-        if let Some(field) = arguments.get("field").and_then(|v| v.as_str()) {
-            args.push("--field".to_string());
-            args.push(field.to_string());
-        }
-
-        // Add variant
-        if let Some(variant) = arguments.get("variant").and_then(|v| v.as_str()) {
-            args.push("--variant".to_string());
-            args.push(variant.to_string());
-        }
-
-        // Add method
-        if let Some(method) = arguments.get("method").and_then(|v| v.as_str()) {
-            args.push("--method".to_string());
-            args.push(method.to_string());
-        }
-
-        // Add derive
-        if let Some(derive) = arguments.get("derive").and_then(|v| v.as_str()) {
-            args.push("--derive".to_string());
-            args.push(derive.to_string());
-        }
-
-        // Add use
-        if let Some(use_path) = arguments.get("use").and_then(|v| v.as_str()) {
-            args.push("--use".to_string());
-            args.push(use_path.to_string());
-        }
-
-        // Add match-arm
-        if let Some(match_arm) = arguments.get("match_arm").and_then(|v| v.as_str()) {
-            args.push("--match-arm".to_string());
-            args.push(match_arm.to_string());
-        }
-
-        // Add body
-        if let Some(body) = arguments.get("body").and_then(|v| v.as_str()) {
-            args.push("--body".to_string());
-            args.push(body.to_string());
-        }
-
-        // Add function
-        if let Some(function) = arguments.get("function").and_then(|v| v.as_str()) {
-            args.push("--function".to_string());
-            args.push(function.to_string());
-        }
-
-        // Add doc-comment
-        if let Some(doc_comment) = arguments.get("doc_comment").and_then(|v| v.as_str()) {
-            args.push("--doc-comment".to_string());
-            args.push(doc_comment.to_string());
-        }
-
-        // Add literal-default
-        if let Some(literal_default) = arguments.get("literal_default").and_then(|v| v.as_str()) {
-            args.push("--literal-default".to_string());
-            args.push(literal_default.to_string());
-        }
-
-        // Add literal-only (boolean flag)
-        if self.get_bool(arguments, "literal_only") {
-            args.push("--literal-only".to_string());
-        }
+/// Run `rs-hack <command> <args>` as a one-shot process, feeding `stdin` to
+/// it when given. Used when the shared daemon can't take the call.
+fn run_rs_hack(command: &str, args: &[String], stdin: Option<&[u8]>) -> Result<CliOutput> {
+    let mut child = Command::new("rs-hack")
+        .arg(command)
+        .args(args)
+        .stdin(if stdin.is_some() {
+            Stdio::piped()
+        } else {
+            Stdio::null()
+        })
+        .stdout(Stdio::piped())
+        .stderr(Stdio::piped())
+        .spawn()
+        .map_err(|e| anyhow!("Failed to run rs-hack: {}. Is it installed?", e))?;
+
+    // rs-hack reads its whole spec before producing output; dropping the
+    // handle afterwards closes the pipe
+    if let Some(input) = stdin
+        && let Some(mut pipe) = child.stdin.take()
+    {
+        pipe.write_all(input)?;
+    }
 
-        // Add position
-        if let Some(position) = arguments.get("position").and_then(|v| v.as_str()) {
-            args.push("--position".to_string());
-            args.push(position.to_string());
-        }
+    let output = child.wait_with_output()?;
+    Ok(CliOutput {
+        success: output.status.success(),
+        stdout: output.stdout,
+        stderr: output.stderr,
+    })
+}
 
-        // Add auto-detect (boolean flag)
-        if self.get_bool(arguments, "auto_detect") {
-            args.push("--auto-detect".to_string());
-        }
+/// `apply_plan` arguments as a batch spec for `rs-hack batch --spec -`.
+fn plan_spec(arguments: &Value) -> Result<Vec<u8>> {
+    let params: ApplyPlanParams = decode("apply_plan", arguments)?;
+    // Steps are forwarded as-is; rs-hack validates them against `Operation`
+    let steps = arguments
+        .get("steps")
+        .and_then(Value::as_array)
+        .ok_or_else(|| anyhow!("apply_plan: 'steps' must be an array of operations"))?;
+
+    Ok(serde_json::to_vec(&BatchSpec {
+        base_path: params.paths,
+        operations: steps,
+    })?)
+}
 
-        // Add enum-name
-        if let Some(enum_name) = arguments.get("enum_name").and_then(|v| v.as_str()) {
-            args.push("--enum-name".to_string());
-            args.push(enum_name.to_string());
-        }
+/// Decodes a tool's JSON arguments into its parameter struct. String fields
+/// typed `&str` borrow from `arguments` instead of being copied.
+fn decode<'a, T: Deserialize<'a>>(tool: &str, arguments: &'a Value) -> Result<T> {
+    T::deserialize(arguments).map_err(|e| anyhow!("{}: invalid arguments: {}", tool, e))
+}
 
-        // Add apply (boolean flag)
-        if self.get_bool(arguments, "apply") {
-            args.push("--apply".to_string());
-        }
+/// Decoder for optional arguments: `null` or a value of the wrong type counts
+/// as absent, as it did when arguments were read with `Value::as_*`, rather
+/// than failing the call.
+fn lenient<'de, D: Deserializer<'de>, T: Deserialize<'de>>(
+    deserializer: D,
+) -> std::result::Result<Option<T>, D::Error> {
+    #[derive(Deserialize)]
+    #[serde(untagged)]
+    enum Lenient<T> {
+        Valid(T),
+        Invalid(IgnoredAny),
     }
 
-    fn add_remove_args(&self, arguments: &Value, args: &mut Vec<String>) {
-        // Add paths (required)
-        if let Some(paths) = arguments.get("paths").and_then(|v| v.as_str()) {
-            args.push("--paths".to_string());
-            args.push(paths.to_string());
-        }
-
-        // Add name (required)
-        if let Some(name) = arguments.get("name").and_then(|v| v.as_str()) {
-            args.push("--name".to_string());
-            args.push(name.to_string());
-        }
-
-        // Add kind or node-type (mutually exclusive)
-        if let Some(kind) = arguments.get("kind").and_then(|v| v.as_str()) {
-            args.push("--kind".to_string());
-            args.push(kind.to_string());
-        } else if let Some(node_type) = arguments.get("node_type").and_then(|v| v.as_str()) {
-            args.push("--node-type".to_string());
-            args.push(node_type.to_string());
-        }
+    Ok(match Lenient::deserialize(deserializer)? {
+        Lenient::Valid(value) => Some(value),
+        Lenient::Invalid(_) => None,
+    })
+}
 
-        // Add field-name
-        if let Some(field_name) = arguments.get("field_name").and_then(|v| v.as_str()) {
-            args.push("--field-name".to_string());
-            args.push(field_name.to_string());
-        }
+/// Arguments of the in-process `find` tool.
+#[derive(Deserialize)]
+struct FindParams<'a> {
+    paths: &'a str,
+    #[serde(borrow, default, deserialize_with = "lenient")]
+    format: Option<&'a str>,
+    #[serde(default, deserialize_with = "lenient")]
+    kind: Option<String>,
+    #[serde(default, deserialize_with = "lenient")]
+    node_type: Option<String>,
+    #[serde(default, deserialize_with = "lenient")]
+    name: Option<String>,
+    #[serde(default, deserialize_with = "lenient")]
+    variant: Option<String>,
+    #[serde(default, deserialize_with = "lenient")]
+    content_filter: Option<String>,
+    #[serde(default, deserialize_with = "lenient")]
+    field_name: Option<String>,
+    #[serde(default, deserialize_with = "lenient")]
+    include_comments: Option<bool>,
+    #[serde(default, deserialize_with = "lenient")]
+    context: Option<usize>,
+    #[serde(default, deserialize_with = "lenient")]
+    parallel: Option<bool>,
+    #[serde(default, deserialize_with = "lenient")]
+    limit: Option<usize>,
+}
 
-        // Add variant
-        if let Some(variant) = arguments.get("variant").and_then(|v| v.as_str()) {
-            args.push("--variant".to_string());
-            args.push(variant.to_string());
-        }
+#[derive(Deserialize)]
+struct FindBatchParams<'a> {
+    paths: &'a str,
+    queries: Vec<FindQuery>,
+    #[serde(default, deserialize_with = "lenient")]
+    parallel: Option<bool>,
+    #[serde(default, deserialize_with = "lenient")]
+    limit: Option<usize>,
+}
 
-        // Add method
-        if let Some(method) = arguments.get("method").and_then(|v| v.as_str()) {
-            args.push("--method".to_string());
-            args.push(method.to_string());
-        }
+/// Union of the discovery tools' arguments; each tool checks the ones it needs.
+#[derive(Deserialize)]
+struct DiscoveryParams<'a> {
+    #[serde(borrow, default, deserialize_with = "lenient")]
+    paths: Option<&'a str>,
+    #[serde(borrow, default, deserialize_with = "lenient")]
+    path: Option<&'a str>,
+    #[serde(borrow, default, deserialize_with = "lenient", rename = "trait")]
+    trait_name: Option<&'a str>,
+    #[serde(borrow, default, deserialize_with = "lenient", rename = "enum")]
+    enum_name: Option<&'a str>,
+    #[serde(default, deserialize_with = "lenient")]
+    fields: Option<bool>,
+}
 
-        // Add derive
-        if let Some(derive) = arguments.get("derive").and_then(|v| v.as_str()) {
-            args.push("--derive".to_string());
-            args.push(derive.to_string());
-        }
+#[derive(Deserialize)]
+struct ApplyPlanParams<'a> {
+    paths: &'a str,
+}
 
-        // Add match-arm
-        if let Some(match_arm) = arguments.get("match_arm").and_then(|v| v.as_str()) {
-            args.push("--match-arm".to_string());
-            args.push(match_arm.to_string());
-        }
+/// Body of a `rs-hack batch` spec.
+#[derive(Serialize)]
+struct BatchSpec<'a> {
+    base_path: &'a str,
+    operations: &'a [Value],
+}
 
-        // Add function
-        if let Some(function) = arguments.get("function").and_then(|v| v.as_str()) {
-            args.push("--function".to_string());
-            args.push(function.to_string());
-        }
+/// Strip surrounding whitespace without reallocating: truncate the tail,
+/// shift the body over any leading whitespace.
+fn trim_in_place(text: &mut String) {
+    text.truncate(text.trim_end().len());
+    let leading = text.len() - text.trim_start().len();
+    text.drain(..leading);
+}
 
-        // Add doc-comment (boolean flag)
-        if self.get_bool(arguments, "doc_comment") {
-            args.push("--doc-comment".to_string());
-        }
+/// How one JSON tool argument maps onto `rs-hack` argv. Absent arguments
+/// (and `false` switches) contribute nothing.
+enum ArgSpec {
+    /// String passed as `--flag <value>`
+    Str(&'static str, &'static str),
+    /// Integer passed as `--flag <n>`
+    Number(&'static str, &'static str),
+    /// `true` adds a bare `--flag`
+    Switch(&'static str, &'static str),
+    /// Explicit `false` adds these tokens (for arguments that default to true)
+    IfFalse(&'static str, &'static [&'static str]),
+    /// String passed as a positional argument
+    Positional(&'static str),
+    /// Tokens added unconditionally
+    Fixed(&'static [&'static str]),
+    /// `kind` wins over `node_type` (mutually exclusive on the CLI)
+    KindOrNodeType,
+}
 
-        // Add literal-only (boolean flag)
-        if self.get_bool(arguments, "literal_only") {
-            args.push("--literal-only".to_string());
-        }
+impl ArgSpec {
+    fn push(&self, arguments: &Value, args: &mut Vec<String>) {
+        let str_arg = |key: &str| arguments.get(key).and_then(|v| v.as_str());
 
-        // Add apply (boolean flag)
-        if self.get_bool(arguments, "apply") {
-            args.push("--apply".to_string());
+        match *self {
+            Self::Str(key, flag) => {
+                if let Some(value) = str_arg(key) {
+                    args.push(flag.to_string());
+                    args.push(value.to_string());
+                }
+            }
+            Self::Number(key, flag) => {
+                if let Some(n) = arguments.get(key).and_then(|v| v.as_i64()) {
+                    args.push(flag.to_string());
+                    args.push(n.to_string());
+                }
+            }
+            Self::Switch(key, flag) => {
+                if arguments.get(key).and_then(|v| v.as_bool()) == Some(true) {
+                    args.push(flag.to_string());
+                }
+            }
+            Self::IfFalse(key, tokens) => {
+                if arguments.get(key).and_then(|v| v.as_bool()) == Some(false) {
+                    args.extend(tokens.iter().map(|t| t.to_string()));
+                }
+            }
+            Self::Positional(key) => {
+                if let Some(value) = str_arg(key) {
+                    args.push(value.to_string());
+                }
+            }
+            Self::Fixed(tokens) => {
+                args.extend(tokens.iter().map(|t| t.to_string()));
+            }
+            Self::KindOrNodeType => {
+                if let Some(kind) = str_arg("kind") {
+                    args.push("--kind".to_string());
+                    args.push(kind.to_string());
+                } else if let Some(node_type) = str_arg("node_type") {
+                    args.push("--node-type".to_string());
+                    args.push(node_type.to_string());
+                }
+            }
         }
     }
+}
 
-    fn add_update_args(&self, arguments: &Value, args: &mut Vec<String>) {
-        // Add paths (required)
-        if let Some(paths) = arguments.get("paths").and_then(|v| v.as_str()) {
-            args.push("--paths".to_string());
-            args.push(paths.to_string());
-        }
-
-        // Add name (required)
-        if let Some(name) = arguments.get("name").and_then(|v| v.as_str()) {
-            args.push("--name".to_string());
-            args.push(name.to_string());
-        }
-
-        // Add kind or node-type (mutually exclusive)
-        if let Some(kind) = arguments.get("kind").and_then(|v| v.as_str()) {
-            args.push("--kind".to_string());
-            args.push(kind.to_string());
-        } else if let Some(node_type) = arguments.get("node_type").and_then(|v| v.as_str()) {
-            args.push("--node-type".to_string());
-            args.push(node_type.to_string());
-        }
-
-        // Add field
-        if let Some(field) = arguments.get("field").and_then(|v| v.as_str()) {
-            args.push("--field".to_string());
-            args.push(field.to_string());
-        }
-
-        // Add variant
-        if let Some(variant) = arguments.get("variant").and_then(|v| v.as_str()) {
-            args.push("--variant".to_string());
-            args.push(variant.to_string());
-        }
-
-        // Add match-arm
-        if let Some(match_arm) = arguments.get("match_arm").and_then(|v| v.as_str()) {
-            args.push("--match-arm".to_string());
-            args.push(match_arm.to_string());
-        }
-
-        // Add body
-        if let Some(body) = arguments.get("body").and_then(|v| v.as_str()) {
-            args.push("--body".to_string());
-            args.push(body.to_string());
-        }
-
-        // Add function
-        if let Some(function) = arguments.get("function").and_then(|v| v.as_str()) {
-            args.push("--function".to_string());
-            args.push(function.to_string());
+/// Tool name → (rs-hack subcommand, argument table), built once at compile
+/// time instead of per call.
+const COMMANDS: &[(&str, &str, &[ArgSpec])] = &[
+    ("find", "find", FIND_ARGS),
+    // Unified CRUD commands (v0.5.0)
+    ("add", "add", ADD_ARGS),
+    ("remove", "remove", REMOVE_ARGS),
+    ("update", "update", UPDATE_ARGS),
+    ("rename", "rename", RENAME_ARGS),
+    ("transform", "transform", TRANSFORM_ARGS),
+    ("history", "history", &[Number("limit", "--limit")]),
+    (
+        "revert",
+        "revert",
+        &[Positional("run_id"), Switch("force", "--force")],
+    ),
+    ("clean", "clean", &[Number("keep_days", "--keep-days")]),
+    // Steps are piped to stdin as a batch spec (see `plan_spec`)
+    (
+        "apply_plan",
+        "batch",
+        &[Fixed(&["--spec", "-"]), Switch("apply", "--apply")],
+    ),
+    (
+        "batch",
+        "batch",
+        &[Str("spec", "--spec"), Switch("apply", "--apply")],
+    ),
+];
+
+const FIND_ARGS: &[ArgSpec] = &[
+    Str("paths", "--paths"),
+    Str("node_type", "--node-type"),
+    Str("name", "--name"),
+    Str("variant", "--variant"),
+    Str("content_filter", "--content-filter"),
+    IfFalse("include_comments", &["--include-comments", "false"]),
+    Str("format", "--format"),
+    Str("field_name", "--field-name"),
+    Number("limit", "--limit"),
+];
+
+const TRANSFORM_ARGS: &[ArgSpec] = &[
+    Str("paths", "--paths"),
+    Str("node_type", "--node-type"),
+    Str("action", "--action"),
+    Str("name", "--name"),
+    Str("content_filter", "--content-filter"),
+    Str("with", "--with"),
+    Switch("apply", "--apply"),
+];
+
+/// `transform` actions, and whether each needs a `with` replacement.
+const TRANSFORM_ACTIONS: [(&str, bool); 3] =
+    [("comment", false), ("remove", false), ("replace", true)];
+
+/// Checks `action` and its `with` requirement. `node_type` is left to
+/// rs-hack, which accepts every `inspect` node type and names the bad one.
+fn check_transform(arguments: &Value) -> Result<()> {
+    let str_arg = |key: &str| arguments.get(key).and_then(|v| v.as_str());
+
+    if let Some(action) = str_arg("action") {
+        match TRANSFORM_ACTIONS.iter().find(|(name, _)| *name == action) {
+            None => {
+                return Err(anyhow!(
+                    "transform: invalid action '{}'. Use 'comment', 'remove', or 'replace'",
+                    action
+                ));
+            }
+            Some((_, true)) if str_arg("with").is_none() => {
+                return Err(anyhow!(
+                    "transform: 'with' is required when action is '{}'",
+                    action
+                ));
+            }
+            Some(_) => {}
         }
+    }
 
-        // Add doc-comment
-        if let Some(doc_comment) = arguments.get("doc_comment").and_then(|v| v.as_str()) {
-            args.push("--doc-comment".to_string());
-            args.push(doc_comment.to_string());
-        }
+    Ok(())
+}
 
-        // Add apply (boolean flag)
-        if self.get_bool(arguments, "apply") {
-            args.push("--apply".to_string());
-        }
+const ADD_ARGS: &[ArgSpec] = &[
+    Str("paths", "--paths"),
+    Str("name", "--name"),
+    KindOrNodeType,
+    Str("field", "--field"),
+    Str("variant", "--variant"),
+    Str("method", "--method"),
+    Str("derive", "--derive"),
+    Str("use", "--use"),
+    Str("match_arm", "--match-arm"),
+    Str("body", "--body"),
+    Str("function", "--function"),
+    Str("doc_comment", "--doc-comment"),
+    Str("literal_default", "--literal-default"),
+    Switch("literal_only", "--literal-only"),
+    Str("position", "--position"),
+    Switch("auto_detect", "--auto-detect"),
+    Str("enum_name", "--enum-name"),
+    Switch("apply", "--apply"),
+];
+
+const REMOVE_ARGS: &[ArgSpec] = &[
+    Str("paths", "--paths"),
+    Str("name", "--name"),
+    KindOrNodeType,
+    Str("field_name", "--field-name"),
+    Str("variant", "--variant"),
+    Str("method", "--method"),
+    Str("derive", "--derive"),
+    Str("match_arm", "--match-arm"),
+    Str("function", "--function"),
+    Switch("doc_comment", "--doc-comment"),
+    Switch("literal_only", "--literal-only"),
+    Switch("apply", "--apply"),
+];
+
+const UPDATE_ARGS: &[ArgSpec] = &[
+    Str("paths", "--paths"),
+    Str("name", "--name"),
+    KindOrNodeType,
+    Str("field", "--field"),
+    Str("variant", "--variant"),
+    Str("match_arm", "--match-arm"),
+    Str("body", "--body"),
+    Str("function", "--function"),
+    Str("doc_comment", "--doc-comment"),
+    Switch("apply", "--apply"),
+];
+
+const RENAME_ARGS: &[ArgSpec] = &[
+    Str("paths", "--paths"),
+    Str("name", "--name"),
+    Str("to", "--to"),
+    KindOrNodeType,
+    Str("enum_path", "--enum-path"),
+    Str("function_path", "--function-path"),
+    Str("edit_mode", "--edit-mode"),
+    IfFalse("validate", &["--no-validate"]),
+    Switch("parallel", "--parallel"),
+    Switch("apply", "--apply"),
+];
+
+#[cfg(test)]
+mod tests {
+    use std::fs;
+    use std::path::Path;
+    use std::time::{Duration, SystemTime};
+
+    use tempfile::TempDir;
+
+    use super::*;
+
+    /// Push `path`'s mtime well past the caches' mtime granularity.
+    fn backdate(path: &Path) -> std::io::Result<()> {
+        let past = SystemTime::now() - Duration::from_secs(60);
+        fs::File::open(path)?.set_modified(past)
     }
 
-    fn add_rename_args(&self, arguments: &Value, args: &mut Vec<String>) {
-        // Add paths (required)
-        if let Some(paths) = arguments.get("paths").and_then(|v| v.as_str()) {
-            args.push("--paths".to_string());
-            args.push(paths.to_string());
-        }
+    #[test]
+    fn test_mutating_and_cacheable_calls() {
+        let dry_run = json!({"paths": "src"});
+        let applied = json!({"paths": "src", "apply": true});
 
-        // Add name (required - current name)
-        if let Some(name) = arguments.get("name").and_then(|v| v.as_str()) {
-            args.push("--name".to_string());
-            args.push(name.to_string());
+        for name in ["find", "summary", "rename", "transform"] {
+            assert!(!ToolRegistry::is_mutating(name, &dry_run), "{}", name);
+            assert!(ToolRegistry::is_cacheable(name, &dry_run), "{}", name);
         }
-
-        // Add to (required - new name)
-        if let Some(to) = arguments.get("to").and_then(|v| v.as_str()) {
-            args.push("--to".to_string());
-            args.push(to.to_string());
+        for name in ["rename", "transform", "apply_plan"] {
+            assert!(ToolRegistry::is_mutating(name, &applied), "{}", name);
+            assert!(!ToolRegistry::is_cacheable(name, &applied), "{}", name);
         }
-
-        // Add kind or node-type (mutually exclusive)
-        if let Some(kind) = arguments.get("kind").and_then(|v| v.as_str()) {
-            args.push("--kind".to_string());
-            args.push(kind.to_string());
-        } else if let Some(node_type) = arguments.get("node_type").and_then(|v| v.as_str()) {
-            args.push("--node-type".to_string());
-            args.push(node_type.to_string());
+        for name in ["revert", "clean", "batch"] {
+            assert!(ToolRegistry::is_mutating(name, &dry_run), "{}", name);
+            assert!(!ToolRegistry::is_cacheable(name, &dry_run), "{}", name);
         }
-
-        // Add enum-path
-        if let Some(enum_path) = arguments.get("enum_path").and_then(|v| v.as_str()) {
-            args.push("--enum-path".to_string());
-            args.push(enum_path.to_string());
+        // Read run state or list non-Rust files, which the cache key doesn't cover
+        for name in ["history", "neighbors"] {
+            assert!(!ToolRegistry::is_mutating(name, &dry_run), "{}", name);
+            assert!(!ToolRegistry::is_cacheable(name, &dry_run), "{}", name);
         }
 
-        // Add function-path
-        if let Some(function_path) = arguments.get("function_path").and_then(|v| v.as_str()) {
-            args.push("--function-path".to_string());
-            args.push(function_path.to_string());
-        }
-
-        // Add edit-mode
-        if let Some(edit_mode) = arguments.get("edit_mode").and_then(|v| v.as_str()) {
-            args.push("--edit-mode".to_string());
-            args.push(edit_mode.to_string());
-        }
+        // A non-boolean `apply` is not an apply
+        let odd = json!({"paths": "src", "apply": "true"});
+        assert!(!ToolRegistry::is_mutating("rename", &odd));
+        assert!(ToolRegistry::is_cacheable("rename", &odd));
+    }
 
-        // Add validate (default is true, so only add if explicitly set to false)
-        if let Some(validate) = arguments.get("validate").and_then(|v| v.as_bool())
-            && !validate
-        {
-            args.push("--no-validate".to_string());
-        }
+    #[test]
+    fn test_lenient_arguments_treat_null_and_mistyped_values_as_absent() -> Result<()> {
+        let arguments = json!({
+            "paths": "src",
+            "format": null,
+            "name": "Config",
+            "limit": "10",
+            "context": 1.5,
+            "parallel": "yes",
+            "include_comments": false,
+        });
+        let params: FindParams = decode("find", &arguments)?;
+        assert_eq!(params.paths, "src");
+        assert_eq!(params.format, None);
+        assert_eq!(params.name.as_deref(), Some("Config"));
+        assert_eq!(params.limit, None);
+        assert_eq!(params.context, None);
+        assert_eq!(params.parallel, None);
+        assert_eq!(params.include_comments, Some(false));
+
+        let arguments = json!({"paths": 3, "trait": "Display", "fields": 1});
+        let params: DiscoveryParams = decode("impls", &arguments)?;
+        assert_eq!(params.paths, None);
+        assert_eq!(params.trait_name, Some("Display"));
+        assert_eq!(params.fields, None);
+
+        // Required arguments are still checked
+        let error = decode::<FindParams>("find", &json!({"paths": null})).err();
+        assert!(error.is_some_and(|e| e.to_string().starts_with("find: invalid arguments")));
+        Ok(())
+    }
 
-        // Add apply (boolean flag)
-        if self.get_bool(arguments, "apply") {
-            args.push("--apply".to_string());
-        }
+    #[test]
+    fn test_cached_results_follow_edits_creations_and_deletions() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let dir = temp_dir.path();
+        let lib = dir.join("lib.rs");
+        fs::write(&lib, "pub struct Alpha;\n")?;
+        backdate(&lib)?;
+        backdate(dir)?;
+
+        let registry = ToolRegistry::new();
+        let find = || registry.call("find", json!({"paths": dir, "node_type": "struct"}));
+        let first = find()?;
+        assert!(first.contains("\"Alpha\""));
+        assert_eq!(find()?, first);
+
+        fs::write(&lib, "pub struct Beta;\n")?;
+        backdate(&lib)?;
+        let edited = find()?;
+        assert!(edited.contains("\"Beta\"") && !edited.contains("\"Alpha\""));
+
+        let extra = dir.join("extra.rs");
+        fs::write(&extra, "pub struct Gamma;\n")?;
+        backdate(&extra)?;
+        backdate(dir)?;
+        let created = find()?;
+        assert!(created.contains("\"Beta\"") && created.contains("\"Gamma\""));
+
+        fs::remove_file(&extra)?;
+        backdate(dir)?;
+        let deleted = find()?;
+        assert!(deleted.contains("\"Beta\"") && !deleted.contains("\"Gamma\""));
+        Ok(())
     }
 }
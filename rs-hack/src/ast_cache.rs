@@ -0,0 +1,152 @@
+//! Content-addressed cache of parsed files for read-only queries.
+//!
+//! Only `find` (and the MCP tools built on it) reads through this cache;
+//! edits, discovery reports and the rest of rs-hack parse afresh.
+//!
+//! Parsing dominates the cost of `find` and is deterministic in the file's
+//! bytes, so a file whose contents hash the same as a previous parse reuses
+//! that [`RustEditor`]. Any edit changes the hash; there is nothing else to
+//! invalidate.
+//!
+//! syn ASTs carry proc-macro2 spans that index a thread-local source map, so
+//! they are neither `Send` nor meaningful on another thread. The cache is
+//! therefore per thread: it pays off in long-lived threads (the MCP server's
+//! blocking pool, repeated queries within one run), not across shards of a
+//! `--parallel` scan. Since a process can run hundreds of such threads, the
+//! source bytes cached by all of them share one process-wide budget.
+
+use std::cell::RefCell;
+use std::collections::{HashMap, VecDeque};
+use std::rc::Rc;
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+use anyhow::Result;
+
+use crate::editor::RustEditor;
+
+/// Parsed files kept per thread before the least recently used is evicted.
+const CAPACITY: usize = 256;
+
+/// Source bytes cached across all threads. A parse takes several times its
+/// source size, so this keeps the process's ASTs to a few hundred MB.
+const MAX_SOURCE_BYTES: usize = 32 << 20;
+
+/// Source bytes currently cached by every thread together.
+static CACHED_BYTES: AtomicUsize = AtomicUsize::new(0);
+
+/// Claim `size` bytes of the shared budget, if that stays within it.
+fn reserve(size: usize) -> bool {
+    CACHED_BYTES
+        .fetch_update(Ordering::Relaxed, Ordering::Relaxed, |total| {
+            total
+                .checked_add(size)
+                .filter(|total| *total <= MAX_SOURCE_BYTES)
+        })
+        .is_ok()
+}
+
+#[derive(Default)]
+struct AstCache {
+    /// Each parse with the size of its source.
+    editors: HashMap<blake3::Hash, (Rc<RustEditor>, usize)>,
+    /// Recency order, least recently used first.
+    order: VecDeque<blake3::Hash>,
+}
+
+impl AstCache {
+    fn touch(&mut self, hash: blake3::Hash) {
+        if let Some(pos) = self.order.iter().position(|h| *h == hash) {
+            self.order.remove(pos);
+        }
+        self.order.push_back(hash);
+    }
+
+    fn evict_oldest(&mut self) -> bool {
+        let Some(oldest) = self.order.pop_front() else {
+            return false;
+        };
+        if let Some((_, size)) = self.editors.remove(&oldest) {
+            CACHED_BYTES.fetch_sub(size, Ordering::Relaxed);
+        }
+        true
+    }
+
+    fn insert(&mut self, hash: blake3::Hash, editor: Rc<RustEditor>, size: usize) {
+        while self.editors.len() >= CAPACITY && self.evict_oldest() {}
+
+        // Make room from this thread's own entries; if other threads hold the
+        // rest of the budget, this parse just isn't kept
+        while !reserve(size) {
+            if !self.evict_oldest() {
+                return;
+            }
+        }
+        self.editors.insert(hash, (editor, size));
+        self.touch(hash);
+    }
+}
+
+impl Drop for AstCache {
+    /// Return this thread's share of the budget when it clears or exits.
+    fn drop(&mut self) {
+        let size: usize = self.editors.values().map(|(_, size)| size).sum();
+        CACHED_BYTES.fetch_sub(size, Ordering::Relaxed);
+    }
+}
+
+thread_local! {
+    static CACHE: RefCell<AstCache> = RefCell::new(AstCache::default());
+}
+
+/// Parse `content`, reusing this thread's previous parse of identical bytes.
+/// Parse errors are not cached.
+pub fn parse(content: &str) -> Result<Rc<RustEditor>> {
+    let hash = blake3::hash(content.as_bytes());
+
+    let hit = CACHE.with_borrow_mut(|cache| {
+        let editor = cache
+            .editors
+            .get(&hash)
+            .map(|(editor, _)| Rc::clone(editor));
+        if editor.is_some() {
+            cache.touch(hash);
+        }
+        editor
+    });
+    if let Some(editor) = hit {
+        return Ok(editor);
+    }
+
+    let editor = Rc::new(RustEditor::new(content)?);
+    CACHE.with_borrow_mut(|cache| cache.insert(hash, Rc::clone(&editor), content.len()));
+    Ok(editor)
+}
+
+/// Drop every cached parse on this thread.
+pub fn clear() {
+    CACHE.with_borrow_mut(|cache| *cache = AstCache::default());
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_parse_reuses_identical_content() -> Result<()> {
+        clear();
+        let first = parse("struct A;")?;
+        let second = parse("struct A;")?;
+        assert!(Rc::ptr_eq(&first, &second));
+
+        let edited = parse("struct B;")?;
+        assert!(!Rc::ptr_eq(&first, &edited));
+        Ok(())
+    }
+
+    #[test]
+    fn test_parse_errors_are_not_cached() {
+        clear();
+        assert!(parse("struct {").is_err());
+        CACHE.with_borrow(|cache| assert!(cache.editors.is_empty()));
+    }
+}
@@ -1,5 +1,6 @@
 //! `doc-coverage` command: report missing doc-comments for public items.
 
+use std::fmt;
 use std::path::PathBuf;
 
 use anyhow::Result;
@@ -74,25 +75,31 @@ pub fn run(paths: &[PathBuf], check_fields: bool, exclude: &[String]) -> Result<
 }
 
 pub fn render(report: &DocCoverageReport) {
-    println!("Missing docs (items): {}", report.missing_item_count);
-    println!("Missing docs (fields): {}", report.missing_field_count);
+    print!("{report}");
+}
 
-    if report.missing_items.is_empty() {
-        println!("All public items are documented.");
-        return;
-    }
+impl fmt::Display for DocCoverageReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        writeln!(f, "Missing docs (items): {}", self.missing_item_count)?;
+        writeln!(f, "Missing docs (fields): {}", self.missing_field_count)?;
 
-    // Sort by file then line
-    let mut offenders: Vec<&MissingDoc> = report.missing_items.iter().collect();
-    offenders.sort_by(|a, b| a.file_path.cmp(&b.file_path).then(a.line.cmp(&b.line)));
+        if self.missing_items.is_empty() {
+            return writeln!(f, "All public items are documented.");
+        }
 
-    let top: Vec<_> = offenders.iter().take(10).collect();
-    println!("\nTop offenders:");
-    for doc in top {
-        println!("  {}:{}: {}", doc.file_path, doc.line, doc.label);
-    }
-    if offenders.len() > 10 {
-        println!("  ... and {} more", offenders.len() - 10);
+        // Sort by file then line
+        let mut offenders: Vec<&MissingDoc> = self.missing_items.iter().collect();
+        offenders.sort_by(|a, b| a.file_path.cmp(&b.file_path).then(a.line.cmp(&b.line)));
+
+        let top: Vec<_> = offenders.iter().take(10).collect();
+        writeln!(f, "\nTop offenders:")?;
+        for doc in top {
+            writeln!(f, "  {}:{}: {}", doc.file_path, doc.line, doc.label)?;
+        }
+        if offenders.len() > 10 {
+            writeln!(f, "  ... and {} more", offenders.len() - 10)?;
+        }
+        Ok(())
     }
 }
 
@@ -1,14 +1,15 @@
 //! `find` command as a lib API. Returns structured matches; rendering (text,
 //! snippets, hints) is the caller's job — see `main.rs` for the CLI renderer.
 
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 
 use anyhow::{Context, Result};
 use serde::{Deserialize, Serialize};
 
-use crate::editor::RustEditor;
+use crate::ast_cache;
 use crate::files::{collect_rust_files_with_exclusions, expand_kind_to_node_types};
-use crate::operations::{FieldLocation, InspectResult};
+use crate::operations::{FieldContext, FieldLocation, InspectResult};
+use crate::parallel::{default_jobs, map_files};
 
 #[derive(Debug, Clone, Default, Serialize, Deserialize)]
 pub struct FindArgs {
@@ -24,6 +25,12 @@ pub struct FindArgs {
     /// Number of raw source lines to show before each snippet match (like grep -B N)
     #[serde(default)]
     pub context: Option<usize>,
+    /// Shard files across worker threads (see `parallel::default_jobs`)
+    #[serde(default)]
+    pub parallel: bool,
+    /// Stop after this many matches (like head -N); scanning ends early
+    #[serde(default)]
+    pub limit: Option<usize>,
 }
 
 #[derive(Debug, Serialize, Deserialize)]
@@ -40,69 +47,350 @@ impl FindResult {
             Self::Nodes { matches } => matches.is_empty(),
         }
     }
+
+    fn empty_for(query: &FindQuery) -> Self {
+        if query.field_name.is_some() {
+            Self::Field {
+                matches: Vec::new(),
+            }
+        } else {
+            Self::Nodes {
+                matches: Vec::new(),
+            }
+        }
+    }
+
+    pub const fn len(&self) -> usize {
+        match self {
+            Self::Field { matches } => matches.len(),
+            Self::Nodes { matches } => matches.len(),
+        }
+    }
+
+    fn truncate(&mut self, limit: usize) {
+        match self {
+            Self::Field { matches } => matches.truncate(limit),
+            Self::Nodes { matches } => matches.truncate(limit),
+        }
+    }
+
+    fn append(&mut self, other: Self) {
+        match (self, other) {
+            (Self::Field { matches }, Self::Field { matches: more }) => matches.extend(more),
+            (Self::Nodes { matches }, Self::Nodes { matches: more }) => matches.extend(more),
+            _ => unreachable!("per-file results share their query's shape"),
+        }
+    }
+
+    /// Converts to the column-wise form, moving strings rather than copying
+    /// them. Snippets and preceding comments are kept only when `snippets`
+    /// is set; every other attribute of the per-match form is kept.
+    pub fn into_columns(self, snippets: bool) -> FindColumns {
+        let mut columns = FindColumns::default();
+        match self {
+            Self::Field { matches } => {
+                let n = matches.len();
+                columns.kind = MatchKind::Field;
+                columns.file_paths.reserve_exact(n);
+                columns.lines.reserve_exact(n);
+                columns.contexts.reserve_exact(n);
+                for m in matches {
+                    columns.file_paths.push(m.file_path);
+                    columns.lines.push(m.line);
+                    columns.contexts.push(m.context);
+                }
+            }
+            Self::Nodes { matches } => {
+                let n = matches.len();
+                columns.kind = MatchKind::Nodes;
+                columns.file_paths.reserve_exact(n);
+                columns.lines.reserve_exact(n);
+                columns.columns.reserve_exact(n);
+                columns.end_lines.reserve_exact(n);
+                columns.end_columns.reserve_exact(n);
+                columns.node_types.reserve_exact(n);
+                columns.identifiers.reserve_exact(n);
+                if snippets {
+                    columns.snippets.reserve_exact(n);
+                    columns.preceding_comments.reserve_exact(n);
+                }
+                for m in matches {
+                    columns.file_paths.push(m.file_path);
+                    columns.lines.push(m.location.line);
+                    columns.columns.push(m.location.column);
+                    columns.end_lines.push(m.location.end_line);
+                    columns.end_columns.push(m.location.end_column);
+                    columns.node_types.push(m.node_type);
+                    columns.identifiers.push(m.identifier);
+                    if snippets {
+                        columns.snippets.push(m.snippet);
+                        columns.preceding_comments.push(m.preceding_comment);
+                    }
+                }
+            }
+        }
+        columns
+    }
+}
+
+/// Which [`FindResult`] variant a [`FindColumns`] came from; matches the
+/// per-match form's `kind` tag.
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq, Serialize, Deserialize)]
+#[serde(rename_all = "snake_case")]
+pub enum MatchKind {
+    Field,
+    #[default]
+    Nodes,
+}
+
+/// Column-wise ("struct of arrays") form of a [`FindResult`]: one array per
+/// attribute instead of one object per match. Callers that only need
+/// locations never touch snippet data, and the JSON is far smaller than the
+/// per-match form on large result sets.
+///
+/// Every array is always present. `kind` says which ones are filled: field
+/// matches fill `file_paths`, `lines` and `contexts`; node matches fill the
+/// rest, with `snippets` and `preceding_comments` only when requested.
+#[derive(Debug, Default, Serialize, Deserialize)]
+pub struct FindColumns {
+    pub kind: MatchKind,
+    pub file_paths: Vec<String>,
+    pub lines: Vec<usize>,
+    #[serde(default)]
+    pub columns: Vec<usize>,
+    #[serde(default)]
+    pub end_lines: Vec<usize>,
+    #[serde(default)]
+    pub end_columns: Vec<usize>,
+    #[serde(default)]
+    pub node_types: Vec<String>,
+    #[serde(default)]
+    pub identifiers: Vec<String>,
+    #[serde(default)]
+    pub snippets: Vec<String>,
+    #[serde(default)]
+    pub preceding_comments: Vec<Option<String>>,
+    #[serde(default)]
+    pub contexts: Vec<FieldContext>,
+}
+
+impl FindColumns {
+    pub const fn len(&self) -> usize {
+        self.file_paths.len()
+    }
+
+    pub const fn is_empty(&self) -> bool {
+        self.file_paths.is_empty()
+    }
+
+    /// One `file:line:col` per match (`file:line` for field matches), newline
+    /// separated, like `find --format locations`.
+    pub fn locations(&self) -> String {
+        use std::fmt::Write;
+
+        let mut out = String::with_capacity(self.file_paths.iter().map(|f| f.len() + 12).sum());
+        for (i, (file, line)) in self.file_paths.iter().zip(&self.lines).enumerate() {
+            if i > 0 {
+                out.push('\n');
+            }
+            let _ = match self.columns.get(i) {
+                Some(column) => write!(out, "{}:{}:{}", file, line, column),
+                None => write!(out, "{}:{}", file, line),
+            };
+        }
+        out
+    }
+}
+
+/// One query in a batched `find`. Mirrors the per-query subset of
+/// [`FindArgs`]; paths and exclusions are shared across the whole batch.
+#[derive(Debug, Clone, Serialize, Deserialize)]
+pub struct FindQuery {
+    #[serde(default)]
+    pub kind: Option<String>,
+    #[serde(default)]
+    pub node_type: Option<String>,
+    #[serde(default)]
+    pub name: Option<String>,
+    #[serde(default)]
+    pub variant: Option<String>,
+    #[serde(default)]
+    pub content_filter: Option<String>,
+    #[serde(default)]
+    pub field_name: Option<String>,
+    #[serde(default = "default_include_comments")]
+    pub include_comments: bool,
+}
+
+const fn default_include_comments() -> bool {
+    true
+}
+
+impl From<&FindArgs> for FindQuery {
+    fn from(args: &FindArgs) -> Self {
+        Self {
+            kind: args.kind.clone(),
+            node_type: args.node_type.clone(),
+            name: args.name.clone(),
+            variant: args.variant.clone(),
+            content_filter: args.content_filter.clone(),
+            field_name: args.field_name.clone(),
+            include_comments: args.include_comments,
+        }
+    }
+}
+
+#[derive(Debug, Clone, Default, Serialize, Deserialize)]
+pub struct BatchFindArgs {
+    pub paths: Vec<PathBuf>,
+    #[serde(default)]
+    pub exclude: Vec<String>,
+    pub queries: Vec<FindQuery>,
+    /// Shard files across worker threads (see `parallel::default_jobs`)
+    #[serde(default)]
+    pub parallel: bool,
+    /// Cap on matches per query. Files are scanned in order and scanning
+    /// stops once every query has reached the cap.
+    #[serde(default)]
+    pub limit: Option<usize>,
 }
 
 pub fn run(args: &FindArgs) -> Result<FindResult> {
+    let batch = BatchFindArgs {
+        paths: args.paths.clone(),
+        exclude: args.exclude.clone(),
+        queries: vec![FindQuery::from(args)],
+        parallel: args.parallel,
+        limit: args.limit,
+    };
+
+    let mut results = run_batch(&batch)?;
+    Ok(results.pop().expect("one result per query"))
+}
+
+/// Run several queries over the same file set. Each file is read and parsed
+/// once and every query is evaluated against that AST, so K queries cost one
+/// parse per file instead of K. Results are returned in query order.
+pub fn run_batch(args: &BatchFindArgs) -> Result<Vec<FindResult>> {
+    let node_types_per_query = args
+        .queries
+        .iter()
+        .map(node_types_for_query)
+        .collect::<Result<Vec<_>>>()?;
+
     let files = collect_rust_files_with_exclusions(&args.paths, &args.exclude)?;
+    let jobs = if args.parallel { default_jobs() } else { 1 };
 
-    if let Some(field) = &args.field_name {
-        return Ok(FindResult::Field {
-            matches: find_field(&files, field)?,
+    // Without a limit every file is scanned in one pass. With one, files are
+    // scanned in small ordered windows so a satisfied query stops the walk
+    // instead of parsing the rest of the tree.
+    let window = match args.limit {
+        Some(_) => jobs * 4,
+        None => files.len().max(1),
+    };
+
+    let mut results: Vec<FindResult> = args.queries.iter().map(FindResult::empty_for).collect();
+    for chunk in files.chunks(window) {
+        let per_file = map_files(chunk, jobs, |file| {
+            query_file(file, &args.queries, &node_types_per_query)
         });
+        for file_results in per_file {
+            for (result, found) in results.iter_mut().zip(file_results?) {
+                result.append(found);
+            }
+        }
+
+        if let Some(limit) = args.limit
+            && results.iter().all(|r| r.len() >= limit)
+        {
+            break;
+        }
     }
 
-    let node_types_to_search: Vec<Option<&str>> = if let Some(k) = &args.kind {
-        let expanded = expand_kind_to_node_types(k);
-        if expanded.is_empty() {
-            anyhow::bail!(
-                "Unknown kind '{}'. Valid kinds: struct, function, enum, match, identifier, type, macro, const, trait, mod, use",
-                k
-            );
+    if let Some(limit) = args.limit {
+        for result in &mut results {
+            result.truncate(limit);
         }
-        expanded.into_iter().map(Some).collect()
-    } else if let Some(nt) = &args.node_type {
-        vec![Some(nt.as_str())]
-    } else {
-        vec![None]
-    };
+    }
 
-    let mut all_results: Vec<InspectResult> = Vec::new();
+    Ok(results)
+}
 
-    for file in &files {
-        let content = std::fs::read_to_string(file)
-            .with_context(|| format!("Failed to read file: {:?}", file))?;
+/// Evaluate every query against a single file, returning one (possibly
+/// empty) result per query. Files that fail to parse are skipped with a
+/// warning.
+fn query_file(
+    file: &Path,
+    queries: &[FindQuery],
+    node_types_per_query: &[Vec<Option<&str>>],
+) -> Result<Vec<FindResult>> {
+    let mut results: Vec<FindResult> = queries.iter().map(FindResult::empty_for).collect();
 
-        let editor = match RustEditor::new(&content) {
-            Ok(e) => e,
-            Err(e) => {
-                eprintln!("⚠️  Skipping {}: {}", file.display(), e);
-                continue;
-            }
-        };
+    let content = std::fs::read_to_string(file)
+        .with_context(|| format!("Failed to read file: {:?}", file))?;
 
-        for node_type_to_search in &node_types_to_search {
-            let mut results = editor.inspect(
-                *node_type_to_search,
-                args.name.as_deref(),
-                args.variant.as_deref(),
-                args.include_comments,
-            )?;
+    let editor = match ast_cache::parse(&content) {
+        Ok(e) => e,
+        Err(e) => {
+            eprintln!("⚠️  Skipping {}: {}", file.display(), e);
+            return Ok(results);
+        }
+    };
 
-            for result in &mut results {
-                result.file_path = file.to_string_lossy().to_string();
+    for ((query, node_types), result) in queries.iter().zip(node_types_per_query).zip(&mut results)
+    {
+        match result {
+            FindResult::Field { matches } => {
+                let field = query.field_name.as_deref().unwrap_or_default();
+                let mut locations = editor.find_field_locations(field)?;
+                for location in &mut locations {
+                    location.file_path = file.to_string_lossy().to_string();
+                }
+                matches.extend(locations);
             }
+            FindResult::Nodes { matches } => {
+                for node_type_to_search in node_types {
+                    let mut found = editor.inspect(
+                        *node_type_to_search,
+                        query.name.as_deref(),
+                        query.variant.as_deref(),
+                        query.include_comments,
+                    )?;
 
-            if let Some(filter) = &args.content_filter {
-                results.retain(|r| r.snippet.contains(filter));
-            }
+                    for r in &mut found {
+                        r.file_path = file.to_string_lossy().to_string();
+                    }
+
+                    if let Some(filter) = &query.content_filter {
+                        found.retain(|r| r.snippet.contains(filter));
+                    }
 
-            all_results.extend(results);
+                    matches.extend(found);
+                }
+            }
         }
     }
 
-    Ok(FindResult::Nodes {
-        matches: all_results,
-    })
+    Ok(results)
+}
+
+fn node_types_for_query(query: &FindQuery) -> Result<Vec<Option<&str>>> {
+    if query.field_name.is_some() {
+        Ok(Vec::new())
+    } else if let Some(k) = &query.kind {
+        let expanded = expand_kind_to_node_types(k);
+        if expanded.is_empty() {
+            anyhow::bail!(
+                "Unknown kind '{}'. Valid kinds: struct, function, enum, match, identifier, type, macro, const, trait, mod, use",
+                k
+            );
+        }
+        Ok(expanded.into_iter().map(Some).collect())
+    } else if let Some(nt) = &query.node_type {
+        Ok(vec![Some(nt.as_str())])
+    } else {
+        Ok(vec![None])
+    }
 }
 
 /// Re-search across all node types — used by the CLI to suggest near-misses
@@ -116,7 +404,7 @@ pub fn run_unfiltered_by_node_type(args: &FindArgs) -> Result<Vec<InspectResult>
         let content = std::fs::read_to_string(file)
             .with_context(|| format!("Failed to read file: {:?}", file))?;
 
-        let editor = match RustEditor::new(&content) {
+        let editor = match ast_cache::parse(&content) {
             Ok(e) => e,
             Err(_) => continue,
         };
@@ -137,26 +425,189 @@ pub fn run_unfiltered_by_node_type(args: &FindArgs) -> Result<Vec<InspectResult>
     Ok(hint_results)
 }
 
-fn find_field(files: &[PathBuf], field: &str) -> Result<Vec<FieldLocation>> {
-    let mut all_locations: Vec<FieldLocation> = Vec::new();
+#[cfg(test)]
+mod tests {
+    use tempfile::TempDir;
 
-    for file in files {
-        let content = std::fs::read_to_string(file)
-            .with_context(|| format!("Failed to read file: {:?}", file))?;
+    use super::*;
 
-        let editor = match RustEditor::new(&content) {
-            Ok(e) => e,
-            Err(e) => {
-                eprintln!("⚠️  Skipping {}: {}", file.display(), e);
-                continue;
-            }
-        };
-        let mut locations = editor.find_field_locations(field)?;
-        for location in &mut locations {
-            location.file_path = file.to_string_lossy().to_string();
+    fn query(node_type: &str, name: Option<&str>) -> FindQuery {
+        FindQuery {
+            kind: None,
+            node_type: Some(node_type.to_string()),
+            name: name.map(String::from),
+            variant: None,
+            content_filter: None,
+            field_name: None,
+            include_comments: false,
         }
-        all_locations.extend(locations);
     }
 
-    Ok(all_locations)
+    #[test]
+    fn test_run_batch_matches_individual_runs() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file_path = temp_dir.path().join("lib.rs");
+        std::fs::write(
+            &file_path,
+            r#"
+pub struct Config { port: u16 }
+pub enum Status { Draft, Published }
+
+fn build() -> Config {
+    Config { port: 8080 }
+}
+
+fn label(s: Status) -> &'static str {
+    match s {
+        Status::Draft => "draft",
+        Status::Published => "published",
+    }
+}
+"#,
+        )?;
+
+        std::fs::write(
+            temp_dir.path().join("other.rs"),
+            "fn other() -> Config { Config { port: 1 } }\n",
+        )?;
+
+        let mut field_query = query("struct", None);
+        field_query.field_name = Some("port".to_string());
+
+        let queries = vec![
+            query("struct-literal", Some("Config")),
+            query("match-arm", Some("Status::Draft")),
+            field_query,
+        ];
+        let results = run_batch(&BatchFindArgs {
+            paths: vec![temp_dir.path().to_path_buf()],
+            exclude: Vec::new(),
+            queries: queries.clone(),
+            parallel: false,
+            limit: None,
+        })?;
+        assert_eq!(results.len(), 3);
+
+        for (query, batched) in queries.iter().zip(&results) {
+            let single = run(&FindArgs {
+                paths: vec![temp_dir.path().to_path_buf()],
+                kind: query.kind.clone(),
+                node_type: query.node_type.clone(),
+                name: query.name.clone(),
+                field_name: query.field_name.clone(),
+                ..Default::default()
+            })?;
+            assert_eq!(
+                serde_json::to_value(&single)?,
+                serde_json::to_value(batched)?
+            );
+            assert!(!batched.is_empty());
+        }
+
+        assert!(matches!(results[2], FindResult::Field { .. }));
+
+        let sharded = run_batch(&BatchFindArgs {
+            paths: vec![temp_dir.path().to_path_buf()],
+            exclude: Vec::new(),
+            queries,
+            parallel: true,
+            limit: None,
+        })?;
+        assert_eq!(
+            serde_json::to_value(&sharded)?,
+            serde_json::to_value(&results)?
+        );
+        Ok(())
+    }
+
+    #[test]
+    fn test_run_limit_caps_matches_in_file_order() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        for name in ["a.rs", "b.rs", "c.rs"] {
+            std::fs::write(
+                temp_dir.path().join(name),
+                "fn f() { let _ = Config { port: 1 }; let _ = Config { port: 2 }; }\n",
+            )?;
+        }
+
+        let args = FindArgs {
+            paths: vec![temp_dir.path().to_path_buf()],
+            node_type: Some("struct-literal".to_string()),
+            name: Some("Config".to_string()),
+            ..Default::default()
+        };
+        let all = run(&args)?;
+        assert_eq!(all.len(), 6);
+
+        let capped = run(&FindArgs {
+            limit: Some(3),
+            ..args
+        })?;
+        assert_eq!(capped.len(), 3);
+
+        let (FindResult::Nodes { matches: all }, FindResult::Nodes { matches: capped }) =
+            (all, capped)
+        else {
+            panic!("expected node results");
+        };
+        assert_eq!(
+            serde_json::to_value(&all[..3])?,
+            serde_json::to_value(&capped)?
+        );
+        Ok(())
+    }
+
+    #[test]
+    fn test_into_columns_keeps_match_order() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        std::fs::write(
+            temp_dir.path().join("lib.rs"),
+            "pub struct Config { port: u16 }\nfn f() -> Config { Config { port: 1 } }\n",
+        )?;
+
+        let args = FindArgs {
+            paths: vec![temp_dir.path().to_path_buf()],
+            node_type: Some("struct-literal".to_string()),
+            name: Some("Config".to_string()),
+            ..Default::default()
+        };
+        let FindResult::Nodes { matches } = run(&args)? else {
+            panic!("expected node results");
+        };
+
+        let columns = run(&args)?.into_columns(false);
+        assert_eq!(columns.len(), matches.len());
+        assert!(columns.snippets.is_empty());
+        let expected: Vec<String> = matches
+            .iter()
+            .map(|m| format!("{}:{}:{}", m.file_path, m.location.line, m.location.column))
+            .collect();
+        assert_eq!(columns.locations(), expected.join("\n"));
+
+        assert_eq!(columns.kind, MatchKind::Nodes);
+        assert_eq!(columns.end_lines[0], matches[0].location.end_line);
+        assert_eq!(columns.end_columns[0], matches[0].location.end_column);
+        let json = serde_json::to_value(&columns)?;
+        assert!(json["snippets"].as_array().is_some_and(Vec::is_empty));
+
+        let with_snippets = run(&args)?.into_columns(true);
+        assert_eq!(with_snippets.snippets[0], matches[0].snippet);
+        assert_eq!(with_snippets.preceding_comments.len(), matches.len());
+
+        let mut field_args = args;
+        field_args.field_name = Some("port".to_string());
+        let fields = run(&field_args)?.into_columns(false);
+        assert_eq!(fields.len(), 2);
+        assert_eq!(fields.kind, MatchKind::Field);
+        assert_eq!(fields.contexts.len(), 2);
+        assert!(fields.columns.is_empty());
+        assert_eq!(serde_json::to_value(&fields)?["kind"], "field");
+        assert!(
+            fields
+                .locations()
+                .lines()
+                .all(|line| line.matches(':').count() == 1)
+        );
+        Ok(())
+    }
 }
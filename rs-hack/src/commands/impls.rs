@@ -0,0 +1,77 @@
+//! `impls` command: list the types implementing a trait, one row per impl block.
+
+use std::fmt;
+use std::path::PathBuf;
+
+use anyhow::Result;
+
+use crate::commands::find::{self, FindArgs, FindResult};
+
+#[derive(Debug)]
+pub struct ImplsReport {
+    pub trait_name: String,
+    pub implementors: Vec<Implementor>,
+}
+
+#[derive(Debug)]
+pub struct Implementor {
+    pub type_name: String,
+    pub file_path: String,
+    pub line: usize,
+}
+
+pub fn run(paths: &[PathBuf], trait_name: &str, exclude: &[String]) -> Result<ImplsReport> {
+    let args = FindArgs {
+        paths: paths.to_vec(),
+        exclude: exclude.to_vec(),
+        node_type: Some("trait-impl".to_string()),
+        name: Some(trait_name.to_string()),
+        include_comments: false,
+        ..Default::default()
+    };
+
+    let matches = match find::run(&args)? {
+        FindResult::Nodes { matches } => matches,
+        FindResult::Field { .. } => vec![],
+    };
+
+    let implementors = matches
+        .into_iter()
+        .map(|m| {
+            // identifier = "TraitName for TypeName" — split to get type name
+            let type_name = m
+                .identifier
+                .split_once(" for ")
+                .map_or(m.identifier.as_str(), |x| x.1)
+                .to_string();
+            Implementor {
+                type_name,
+                file_path: m.file_path,
+                line: m.location.line,
+            }
+        })
+        .collect();
+
+    Ok(ImplsReport {
+        trait_name: trait_name.to_string(),
+        implementors,
+    })
+}
+
+pub fn render(report: &ImplsReport) {
+    print!("{report}");
+}
+
+impl fmt::Display for ImplsReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        if self.implementors.is_empty() {
+            return writeln!(f, "Trait {} implemented by: (none found)", self.trait_name);
+        }
+
+        writeln!(f, "Trait {} implemented by:", self.trait_name)?;
+        for i in &self.implementors {
+            writeln!(f, "  {} ({}:{})", i.type_name, i.file_path, i.line)?;
+        }
+        Ok(())
+    }
+}
@@ -1,5 +1,6 @@
 //! `match-audit` command: detect match expressions that are missing enum variants.
 
+use std::fmt;
 use std::path::PathBuf;
 
 use anyhow::{Result, bail};
@@ -104,41 +105,50 @@ pub fn run(paths: &[PathBuf], enum_name: &str, exclude: &[String]) -> Result<Mat
 }
 
 pub fn render(report: &MatchReport) {
-    println!("Match audit for enum {}:", report.enum_name);
-    println!("  Known variants: {}", report.all_variants.join(", "));
-    println!();
-
-    if report.match_sites.is_empty() {
-        println!(
-            "  No match expressions found for enum {}.",
-            report.enum_name
-        );
-        return;
-    }
+    print!("{report}");
+}
 
-    println!("Missing variants:");
-    let mut any_missing = false;
-    for site in &report.match_sites {
-        if site.has_wildcard {
-            println!(
-                "  {} ({}:{}): (wildcard — covers all)",
-                site.fn_name, site.file_path, site.line
-            );
-        } else if site.missing_variants.is_empty() {
-            println!("  {}: complete", site.fn_name);
-        } else {
-            println!(
-                "  {} ({}:{}): {}",
-                site.fn_name,
-                site.file_path,
-                site.line,
-                site.missing_variants.join(", ")
+impl fmt::Display for MatchReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        writeln!(f, "Match audit for enum {}:", self.enum_name)?;
+        writeln!(f, "  Known variants: {}", self.all_variants.join(", "))?;
+        writeln!(f)?;
+
+        if self.match_sites.is_empty() {
+            return writeln!(
+                f,
+                "  No match expressions found for enum {}.",
+                self.enum_name
             );
-            any_missing = true;
         }
-    }
-    if !any_missing {
-        println!("  All match expressions are complete.");
+
+        writeln!(f, "Missing variants:")?;
+        let mut any_missing = false;
+        for site in &self.match_sites {
+            if site.has_wildcard {
+                writeln!(
+                    f,
+                    "  {} ({}:{}): (wildcard — covers all)",
+                    site.fn_name, site.file_path, site.line
+                )?;
+            } else if site.missing_variants.is_empty() {
+                writeln!(f, "  {}: complete", site.fn_name)?;
+            } else {
+                writeln!(
+                    f,
+                    "  {} ({}:{}): {}",
+                    site.fn_name,
+                    site.file_path,
+                    site.line,
+                    site.missing_variants.join(", ")
+                )?;
+                any_missing = true;
+            }
+        }
+        if !any_missing {
+            writeln!(f, "  All match expressions are complete.")?;
+        }
+        Ok(())
     }
 }
 
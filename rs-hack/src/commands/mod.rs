@@ -6,6 +6,7 @@
 
 pub mod doc_coverage;
 pub mod find;
+pub mod impls;
 pub mod match_audit;
 pub mod neighbors;
 pub mod summary;
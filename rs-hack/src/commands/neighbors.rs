@@ -1,6 +1,7 @@
 //! `neighbors` command: pure filesystem discovery of related files.
 //! No AST parsing — finds siblings, twin dirs, and test files for any .rs file.
 
+use std::fmt;
 use std::path::{Path, PathBuf};
 
 use anyhow::Result;
@@ -106,6 +107,40 @@ pub fn run(path: &Path) -> Result<NeighborsReport> {
     })
 }
 
+pub fn render(report: &NeighborsReport) {
+    print!("{report}");
+}
+
+impl fmt::Display for NeighborsReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        // Display paths relative to cwd if possible
+        let cwd = std::env::current_dir().ok();
+        let display = |p: &Path| -> String {
+            cwd.as_ref()
+                .and_then(|cwd| p.strip_prefix(cwd).ok())
+                .unwrap_or(p)
+                .to_string_lossy()
+                .into_owned()
+        };
+        let list = |paths: &[PathBuf]| -> String {
+            if paths.is_empty() {
+                "(none)".to_string()
+            } else {
+                paths
+                    .iter()
+                    .map(|p| display(p))
+                    .collect::<Vec<_>>()
+                    .join(", ")
+            }
+        };
+
+        writeln!(f, "Neighbors for {}:", display(&self.target))?;
+        writeln!(f, "  Siblings: {}", list(&self.siblings))?;
+        writeln!(f, "  Twin dirs: {}", list(&self.twin_files))?;
+        writeln!(f, "  Tests: {}", list(&self.test_files))
+    }
+}
+
 /// Walk `dir` recursively and collect all .rs files whose stem contains `stem`.
 fn collect_matching_files(dir: &Path, stem: &str, out: &mut Vec<PathBuf>) {
     if let Ok(entries) = std::fs::read_dir(dir) {
@@ -1,5 +1,6 @@
 //! `summary` command: print a module inventory for a single .rs file.
 
+use std::fmt;
 use std::path::PathBuf;
 
 use anyhow::{Context, Result};
@@ -115,45 +116,48 @@ pub fn run(path: &PathBuf) -> Result<SummaryReport> {
 }
 
 pub fn render(report: &SummaryReport) {
-    println!("Module: {}", report.path.display());
+    print!("{report}");
+}
 
-    if report.public_items.is_empty() {
-        println!("Public items: (none)");
-    } else {
-        println!("Public items: {}", report.public_items.join(", "));
-    }
+impl fmt::Display for SummaryReport {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        writeln!(f, "Module: {}", self.path.display())?;
 
-    println!(
-        "Types: {} struct{}, {} enum{}, {} type alias{}",
-        report.struct_count,
-        if report.struct_count == 1 { "" } else { "s" },
-        report.enum_count,
-        if report.enum_count == 1 { "" } else { "s" },
-        report.type_alias_count,
-        if report.type_alias_count == 1 {
-            ""
+        if self.public_items.is_empty() {
+            writeln!(f, "Public items: (none)")?;
         } else {
-            "es"
-        },
-    );
+            writeln!(f, "Public items: {}", self.public_items.join(", "))?;
+        }
 
-    if report.function_names.is_empty() {
-        println!("Functions: (none)");
-    } else {
-        println!("Functions: {}", report.function_names.join(", "));
-    }
+        writeln!(
+            f,
+            "Types: {} struct{}, {} enum{}, {} type alias{}",
+            self.struct_count,
+            if self.struct_count == 1 { "" } else { "s" },
+            self.enum_count,
+            if self.enum_count == 1 { "" } else { "s" },
+            self.type_alias_count,
+            if self.type_alias_count == 1 { "" } else { "es" },
+        )?;
+
+        if self.function_names.is_empty() {
+            writeln!(f, "Functions: (none)")?;
+        } else {
+            writeln!(f, "Functions: {}", self.function_names.join(", "))?;
+        }
 
-    if report.reexports.is_empty() {
-        println!("Re-exports: (none)");
-    } else {
-        for r in &report.reexports {
-            println!("Re-exports: {}", r);
+        if self.reexports.is_empty() {
+            writeln!(f, "Re-exports: (none)")?;
+        } else {
+            for r in &self.reexports {
+                writeln!(f, "Re-exports: {}", r)?;
+            }
         }
-    }
 
-    match &report.module_doc {
-        Some(doc) => println!("Doc: {:?}", doc),
-        None => println!("Doc: (none)"),
+        match &self.module_doc {
+            Some(doc) => writeln!(f, "Doc: {:?}", doc),
+            None => writeln!(f, "Doc: (none)"),
+        }
     }
 }
 
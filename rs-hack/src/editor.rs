@@ -1820,23 +1820,19 @@ impl RustEditor {
             anyhow::bail!("Enum '{}' not found or has no variants", enum_name);
         }
 
-        // Find existing match arms
-        let existing_patterns = self.find_existing_match_patterns(&op.function_name);
+        // Find existing match arms, normalized once so each variant is a
+        // single set lookup instead of a scan over every arm
+        let existing_patterns: std::collections::HashSet<String> = self
+            .find_existing_match_patterns(&op.function_name)
+            .iter()
+            .map(|p| normalize_pattern(p))
+            .collect();
 
         // Determine missing variants
-        let mut missing_variants = Vec::new();
-        for variant in &enum_variants {
-            let pattern = format!("{}::{}", enum_name, variant);
-            let pattern_normalized = pattern.replace(" ", "");
-
-            let exists = existing_patterns
-                .iter()
-                .any(|p| p.replace(" ", "") == pattern_normalized);
-
-            if !exists {
-                missing_variants.push(variant.clone());
-            }
-        }
+        let missing_variants: Vec<String> = enum_variants
+            .into_iter()
+            .filter(|variant| !existing_patterns.contains(&format!("{}::{}", enum_name, variant)))
+            .collect();
 
         if missing_variants.is_empty() {
             println!("All enum variants already covered in match expressions");
@@ -2662,6 +2658,15 @@ impl RustEditor {
         &self.syntax_tree
     }
 
+    /// Re-parse the syntax tree from the current content. Some surgical edits
+    /// only rewrite the text; call this before applying another operation to
+    /// the same editor so spans line up with what was written.
+    pub fn reparse(&mut self) -> Result<()> {
+        self.syntax_tree = syn::parse_str(&self.content).context("Failed to re-parse content")?;
+        self.line_offsets = Self::compute_line_offsets(&self.content);
+        Ok(())
+    }
+
     /// Replace a range of bytes with new content (for revert operations)
     pub fn replace_range(&mut self, start: usize, end: usize, new_content: &str) -> Result<()> {
         if start > end || end > self.content.len() {
@@ -5741,6 +5746,12 @@ impl VisitMut for MatchArmRemover {
     }
 }
 
+/// Compare match patterns token-insensitively: `Status :: Draft` (as
+/// stringified by `quote`) and `Status::Draft` are the same pattern.
+fn normalize_pattern(pattern: &str) -> String {
+    pattern.replace(' ', "")
+}
+
 // Visitor for adding multiple match arms at once (for auto-detect)
 struct MultiMatchArmAdder {
     target_function: Option<String>,
@@ -5769,15 +5780,17 @@ impl VisitMut for MultiMatchArmAdder {
             return;
         }
 
+        // Stringify this match's patterns once, not once per arm to add
+        let mut existing: std::collections::HashSet<String> = node
+            .arms
+            .iter()
+            .map(|arm| normalize_pattern(&arm.pat.to_token_stream().to_string()))
+            .collect();
+
         // Add all missing arms
         for (pattern_str, arm) in &self.arms_to_add {
             // Check if the pattern already exists (idempotent)
-            let already_exists = node
-                .arms
-                .iter()
-                .any(|existing_arm| existing_arm.pat.to_token_stream().to_string() == *pattern_str);
-
-            if !already_exists {
+            if existing.insert(normalize_pattern(pattern_str)) {
                 node.arms.push(arm.clone());
                 self.modified = true;
                 self.modified_function = self.current_function.clone();
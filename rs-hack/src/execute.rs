@@ -5,13 +5,14 @@
 //! decide what to display; the CLI in `main.rs` wraps these calls with its own renderer.
 
 use std::collections::HashMap;
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 
 use anyhow::{Context, Result};
 use serde::{Deserialize, Serialize};
 
 use crate::editor::RustEditor;
 use crate::operations::{BackupNode, Operation};
+use crate::parallel::{default_jobs, map_files};
 use crate::state::{
     FileModification, RunMetadata, RunStatus, generate_run_id, get_state_dir, hash_file,
     save_backup_nodes, save_run_metadata,
@@ -25,6 +26,10 @@ pub struct ExecuteOpts {
     pub output: Option<PathBuf>,
     /// Stop after this many modifications across all files.
     pub limit: Option<usize>,
+    /// Shard files across worker threads (see `parallel::default_jobs`).
+    /// Ignored when `limit` is set. Changes are still delivered in file order,
+    /// but only after every file has been processed.
+    pub parallel: bool,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -37,7 +42,11 @@ pub struct FileChange {
 
 #[derive(Debug, Default, Serialize, Deserialize)]
 pub struct ExecuteResult {
+    /// Changed files with their contents. Empty for the `*_each` variants,
+    /// which hand each change to a callback instead of retaining it.
     pub changes: Vec<FileChange>,
+    /// Number of files changed (set by every variant).
+    pub files_changed: usize,
     pub total_modifications: usize,
     pub unmatched_qualified_paths: HashMap<String, usize>,
     pub parse_errors: Vec<(PathBuf, String)>,
@@ -48,77 +57,58 @@ pub struct ExecuteResult {
     pub run_id: Option<String>,
     /// Per-file metadata captured for state tracking. Empty for `execute()`.
     pub files_modified: Vec<FileModification>,
+    /// One report per operation, in plan order (a single entry for the
+    /// single-operation variants).
+    pub steps: Vec<StepReport>,
+}
+
+/// What one operation of a plan did across the run.
+///
+/// Steps apply independently: a step that fails in a file is skipped there
+/// while the file's other steps still apply. Usually the failure is just the
+/// step's target not being in that file.
+#[derive(Debug, Clone, Default, Serialize, Deserialize)]
+pub struct StepReport {
+    /// Files this step changed.
+    pub files_changed: usize,
+    /// The last error this step hit in any file.
+    pub last_error: Option<String>,
+    /// Files this step failed in that other steps changed, with the error.
+    /// These were written without this step.
+    pub failed_in_changed: Vec<(PathBuf, String)>,
 }
 
 /// Apply `op` across `files` without printing anything. When `opts.apply` is
 /// true, writes modified files in place (or to `opts.output` if set);
 /// otherwise performs a dry run and only fills the result.
 pub fn execute(files: &[PathBuf], op: &Operation, opts: &ExecuteOpts) -> Result<ExecuteResult> {
-    let mut result = ExecuteResult::default();
-
-    for file_path in files {
-        let content = std::fs::read_to_string(file_path)
-            .with_context(|| format!("Failed to read {}", file_path.display()))?;
-
-        let mut editor = match RustEditor::new(&content) {
-            Ok(editor) => editor,
-            Err(e) => {
-                if files.len() == 1 {
-                    return Err(e)
-                        .with_context(|| format!("Failed to parse {}", file_path.display()));
-                }
-                result
-                    .parse_errors
-                    .push((file_path.clone(), format!("{}", e)));
-                continue;
-            }
-        };
-
-        match editor.apply_operation(op) {
-            Ok(op_result) => {
-                if let Some(unmatched) = op_result.unmatched_qualified_paths {
-                    for (path, count) in unmatched {
-                        *result.unmatched_qualified_paths.entry(path).or_insert(0) += count;
-                    }
-                }
-
-                if op_result.changed {
-                    result.total_modifications += op_result.modified_nodes.len();
-                    let new_content = editor.to_string();
-
-                    if opts.apply {
-                        let write_path = opts.output.as_ref().unwrap_or(file_path);
-                        std::fs::write(write_path, &new_content)
-                            .with_context(|| format!("Failed to write {}", write_path.display()))?;
-                    }
-
-                    result.changes.push(FileChange {
-                        path: file_path.clone(),
-                        old_content: content,
-                        new_content,
-                        modified_nodes: op_result.modified_nodes,
-                    });
-
-                    if let Some(limit) = opts.limit
-                        && result.total_modifications >= limit
-                    {
-                        result.limit_hit = true;
-                        break;
-                    }
-                }
-            }
-            Err(e) => {
-                if files.len() == 1 {
-                    return Err(e);
-                }
-                result.last_error = Some(format!("{}", e));
-            }
-        }
-    }
-
+    let mut changes = Vec::new();
+    let mut result = execute_each(files, op, opts, |change| changes.push(change))?;
+    result.changes = changes;
     Ok(result)
 }
 
+/// Like `execute`, but hands each changed file to `on_change` as soon as it
+/// has been processed instead of collecting them, so a caller rendering diffs
+/// holds one file's contents at a time. `result.changes` stays empty.
+pub fn execute_each<F>(
+    files: &[PathBuf],
+    op: &Operation,
+    opts: &ExecuteOpts,
+    on_change: F,
+) -> Result<ExecuteResult>
+where
+    F: FnMut(FileChange),
+{
+    finish(run_plan(
+        files,
+        std::slice::from_ref(op),
+        opts,
+        None,
+        on_change,
+    ))
+}
+
 /// Like `execute` but records a revertible run.
 ///
 /// Falls back to plain `execute` if `apply` is false or `output` is set (state tracking only
@@ -134,95 +124,630 @@ pub fn execute_with_state(
     local_state: bool,
     command_line: String,
 ) -> Result<ExecuteResult> {
+    let mut changes = Vec::new();
+    let mut result = execute_with_state_each(files, op, opts, local_state, command_line, |c| {
+        changes.push(c)
+    })?;
+    result.changes = changes;
+    Ok(result)
+}
+
+/// `execute_with_state` with per-file delivery, as in `execute_each`.
+pub fn execute_with_state_each<F>(
+    files: &[PathBuf],
+    op: &Operation,
+    opts: &ExecuteOpts,
+    local_state: bool,
+    command_line: String,
+    on_change: F,
+) -> Result<ExecuteResult>
+where
+    F: FnMut(FileChange),
+{
+    execute_plan_with_state_each(
+        files,
+        std::slice::from_ref(op),
+        opts,
+        local_state,
+        command_line,
+        on_change,
+    )
+}
+
+/// Apply every operation in `ops`, in order, across `files` in one pass.
+///
+/// Each file is read and parsed once, all operations are applied to the same
+/// in-memory editor, and the combined result is written (and reported) once:
+/// N operations over K files cost K reads and writes instead of N×K.
+///
+/// Steps apply independently (see [`StepReport`]): a file is written with
+/// every step that succeeded on it, even if another step failed there.
+/// `result.steps` says which steps changed nothing or failed.
+pub fn execute_plan(
+    files: &[PathBuf],
+    ops: &[Operation],
+    opts: &ExecuteOpts,
+) -> Result<ExecuteResult> {
+    let mut changes = Vec::new();
+    let mut result = execute_plan_each(files, ops, opts, |change| changes.push(change))?;
+    result.changes = changes;
+    Ok(result)
+}
+
+/// `execute_plan` with per-file delivery, as in `execute_each`.
+pub fn execute_plan_each<F>(
+    files: &[PathBuf],
+    ops: &[Operation],
+    opts: &ExecuteOpts,
+    on_change: F,
+) -> Result<ExecuteResult>
+where
+    F: FnMut(FileChange),
+{
+    finish(run_plan(files, ops, opts, None, on_change))
+}
+
+/// `execute_plan_each` that records the whole plan as a single revertible
+/// run. Falls back to `execute_plan_each` for dry runs and `output`
+/// overrides, like `execute_with_state`.
+pub fn execute_plan_with_state_each<F>(
+    files: &[PathBuf],
+    ops: &[Operation],
+    opts: &ExecuteOpts,
+    local_state: bool,
+    command_line: String,
+    on_change: F,
+) -> Result<ExecuteResult>
+where
+    F: FnMut(FileChange),
+{
     if !opts.apply || opts.output.is_some() {
-        return execute(files, op, opts);
+        return execute_plan_each(files, ops, opts, on_change);
     }
 
-    let run_id = generate_run_id();
     let state_dir = get_state_dir(local_state)?;
-    let mut result = ExecuteResult::default();
-
-    for file_path in files {
-        let content = std::fs::read_to_string(file_path)
-            .with_context(|| format!("Failed to read {}", file_path.display()))?;
-
-        let mut editor = match RustEditor::new(&content) {
-            Ok(editor) => editor,
-            Err(e) => {
-                if files.len() == 1 {
-                    return Err(e)
-                        .with_context(|| format!("Failed to parse {}", file_path.display()));
+    apply_plan_with_state(files, ops, opts, &state_dir, command_line, on_change)
+}
+
+/// Apply `ops` and record the files written under `state_dir`. A plan that
+/// fails partway still records the files it already wrote, so they can be
+/// reverted, before the error is returned.
+fn apply_plan_with_state<F>(
+    files: &[PathBuf],
+    ops: &[Operation],
+    opts: &ExecuteOpts,
+    state_dir: &Path,
+    command_line: String,
+    on_change: F,
+) -> Result<ExecuteResult>
+where
+    F: FnMut(FileChange),
+{
+    let run_id = generate_run_id();
+    let (mut result, error) = run_plan(files, ops, opts, Some((&run_id, state_dir)), on_change);
+
+    if !result.files_modified.is_empty() {
+        let metadata = RunMetadata {
+            run_id: run_id.clone(),
+            timestamp: chrono::Utc::now(),
+            command: command_line,
+            operation: ops
+                .iter()
+                .map(Operation::kind_name)
+                .collect::<Vec<_>>()
+                .join("+"),
+            files_modified: result.files_modified.clone(),
+            status: RunStatus::Applied,
+            can_revert: true,
+        };
+        save_run_metadata(&metadata, state_dir)?;
+
+        if let Some(e) = error {
+            return Err(e.context(format!(
+                "Stopped after writing {} file(s); revert them with run {}",
+                result.files_modified.len(),
+                run_id
+            )));
+        }
+        result.run_id = Some(run_id);
+    }
+
+    finish((result, error))
+}
+
+/// Collapse `run_plan`'s partial result and first error into a `Result`.
+fn finish(outcome: (ExecuteResult, Option<anyhow::Error>)) -> Result<ExecuteResult> {
+    match outcome {
+        (result, None) => Ok(result),
+        (_, Some(e)) => Err(e),
+    }
+}
+
+/// Run `ops` over `files`, returning what was done along with the first
+/// error, if any. Every file written before the error (or, when sharded,
+/// by any worker) is merged into the result and delivered to `on_change`,
+/// so callers can still record and report it.
+fn run_plan<F>(
+    files: &[PathBuf],
+    ops: &[Operation],
+    opts: &ExecuteOpts,
+    state: Option<(&str, &Path)>,
+    mut on_change: F,
+) -> (ExecuteResult, Option<anyhow::Error>)
+where
+    F: FnMut(FileChange),
+{
+    let single_file = files.len() == 1;
+    let mut result = ExecuteResult {
+        steps: vec![StepReport::default(); ops.len()],
+        ..Default::default()
+    };
+    let mut first_error = None;
+    let mut lone_step_error = None;
+
+    // A limit depends on the running total across files, so limited runs stay
+    // sequential. Sharded changes are delivered in file order once all
+    // workers finish.
+    if opts.parallel && opts.limit.is_none() {
+        let outcomes = map_files(files, default_jobs(), |file_path| {
+            plan_file(file_path, ops, opts, state, single_file)
+        });
+        // Other shards may have written files after a failing one, so merge
+        // them all before reporting the first error in file order
+        for (file_path, outcome) in files.iter().zip(outcomes) {
+            match outcome {
+                Ok(outcome) => {
+                    lone_step_error =
+                        merge_outcome(&mut result, file_path, outcome, &mut on_change);
+                }
+                Err(e) => {
+                    first_error.get_or_insert(e);
                 }
-                result
-                    .parse_errors
-                    .push((file_path.clone(), format!("{}", e)));
-                continue;
             }
-        };
+        }
+    } else {
+        for file_path in files {
+            match plan_file(file_path, ops, opts, state, single_file) {
+                Ok(outcome) => {
+                    lone_step_error =
+                        merge_outcome(&mut result, file_path, outcome, &mut on_change);
+                }
+                Err(e) => {
+                    first_error = Some(e);
+                    break;
+                }
+            }
+
+            if let Some(limit) = opts.limit
+                && result.total_modifications >= limit
+            {
+                result.limit_hit = true;
+                break;
+            }
+        }
+    }
+
+    // A lone file the plan didn't change fails with its first step error, as
+    // a single-file edit always has; elsewhere step errors are only reported
+    if single_file && result.files_changed == 0 && first_error.is_none() {
+        first_error = lone_step_error;
+    }
+    (result, first_error)
+}
+
+/// What `plan_file` did to one file, folded into the run's `ExecuteResult`
+/// by `merge_outcome`.
+#[derive(Default)]
+struct FileOutcome {
+    parse_error: Option<String>,
+    unmatched_qualified_paths: HashMap<String, usize>,
+    modifications: usize,
+    /// Per step: whether it changed this file.
+    steps_changed: Vec<bool>,
+    /// Per step: its error in this file, if it failed.
+    step_errors: Vec<Option<anyhow::Error>>,
+    change: Option<FileChange>,
+    /// Set when the change was written with state tracking.
+    file_modification: Option<FileModification>,
+}
 
+/// Read, parse, and apply `ops` to one file, writing it (and its backups,
+/// when `state` is set) if `opts.apply`. A failing step is recorded and
+/// skipped; only I/O errors and a lone file's parse error fail the file.
+/// Touches nothing shared with other files, so it can run on any worker
+/// thread.
+fn plan_file(
+    file_path: &PathBuf,
+    ops: &[Operation],
+    opts: &ExecuteOpts,
+    state: Option<(&str, &Path)>,
+    single_file: bool,
+) -> Result<FileOutcome> {
+    let mut outcome = FileOutcome::default();
+
+    let content = std::fs::read_to_string(file_path)
+        .with_context(|| format!("Failed to read {}", file_path.display()))?;
+
+    let mut editor = match RustEditor::new(&content) {
+        Ok(editor) => editor,
+        Err(e) => {
+            if single_file {
+                return Err(e).with_context(|| format!("Failed to parse {}", file_path.display()));
+            }
+            outcome.parse_error = Some(format!("{}", e));
+            return Ok(outcome);
+        }
+    };
+
+    let mut changed = false;
+    let mut modified_nodes: Vec<BackupNode> = Vec::new();
+
+    outcome.steps_changed = vec![false; ops.len()];
+    outcome.step_errors = ops.iter().map(|_| None).collect();
+
+    for (step, op) in ops.iter().enumerate() {
         match editor.apply_operation(op) {
             Ok(op_result) => {
                 if let Some(unmatched) = op_result.unmatched_qualified_paths {
                     for (path, count) in unmatched {
-                        *result.unmatched_qualified_paths.entry(path).or_insert(0) += count;
+                        *outcome.unmatched_qualified_paths.entry(path).or_insert(0) += count;
                     }
                 }
 
                 if op_result.changed {
-                    result.total_modifications += op_result.modified_nodes.len();
-                    let new_content = editor.to_string();
-
-                    let hash_before = hash_file(file_path)?;
-                    save_backup_nodes(file_path, &op_result.modified_nodes, &run_id, &state_dir)?;
-
-                    std::fs::write(file_path, &new_content)
-                        .with_context(|| format!("Failed to write {}", file_path.display()))?;
-
-                    let hash_after = hash_file(file_path)?;
-
-                    result.files_modified.push(FileModification {
-                        path: file_path.clone(),
-                        hash_before,
-                        hash_after,
-                        backup_nodes: op_result.modified_nodes.clone(),
-                    });
-                    result.changes.push(FileChange {
-                        path: file_path.clone(),
-                        old_content: content,
-                        new_content,
-                        modified_nodes: op_result.modified_nodes,
-                    });
-
-                    if let Some(limit) = opts.limit
-                        && result.total_modifications >= limit
-                    {
-                        result.limit_hit = true;
-                        break;
+                    changed = true;
+                    outcome.steps_changed[step] = true;
+                    outcome.modifications += op_result.modified_nodes.len();
+                    // Latest step first: revert restores backups in order,
+                    // so the earliest (original) version must land last.
+                    modified_nodes.splice(0..0, op_result.modified_nodes);
+
+                    if step + 1 < ops.len() {
+                        editor.reparse().with_context(|| {
+                            format!(
+                                "Failed to re-parse {} after {}",
+                                file_path.display(),
+                                op.kind_name()
+                            )
+                        })?;
                     }
                 }
             }
-            Err(e) => {
-                if files.len() == 1 {
-                    return Err(e);
-                }
-                result.last_error = Some(format!("{}", e));
+            Err(e) => outcome.step_errors[step] = Some(e),
+        }
+    }
+
+    if !changed {
+        return Ok(outcome);
+    }
+
+    let new_content = editor.to_string();
+
+    if opts.apply {
+        let write_path = opts.output.as_ref().unwrap_or(file_path);
+        match state {
+            Some((run_id, state_dir)) => {
+                let hash_before = hash_file(file_path)?;
+                save_backup_nodes(file_path, &modified_nodes, run_id, state_dir)?;
+
+                std::fs::write(write_path, &new_content)
+                    .with_context(|| format!("Failed to write {}", write_path.display()))?;
+
+                let hash_after = hash_file(file_path)?;
+                outcome.file_modification = Some(FileModification {
+                    path: file_path.clone(),
+                    hash_before,
+                    hash_after,
+                    backup_nodes: modified_nodes.clone(),
+                });
+            }
+            None => {
+                std::fs::write(write_path, &new_content)
+                    .with_context(|| format!("Failed to write {}", write_path.display()))?;
             }
         }
     }
 
-    if !result.files_modified.is_empty() {
-        let metadata = RunMetadata {
-            run_id: run_id.clone(),
-            timestamp: chrono::Utc::now(),
-            command: command_line,
-            operation: op.kind_name().to_string(),
-            files_modified: result.files_modified.clone(),
-            status: RunStatus::Applied,
-            can_revert: true,
+    outcome.change = Some(FileChange {
+        path: file_path.clone(),
+        old_content: content,
+        new_content,
+        modified_nodes,
+    });
+    Ok(outcome)
+}
+
+/// Fold one file's outcome into `result`. Returns the file's first step
+/// error, which `run_plan` reports when the file was the only one.
+fn merge_outcome<F>(
+    result: &mut ExecuteResult,
+    file_path: &Path,
+    outcome: FileOutcome,
+    on_change: &mut F,
+) -> Option<anyhow::Error>
+where
+    F: FnMut(FileChange),
+{
+    if let Some(err) = outcome.parse_error {
+        result.parse_errors.push((file_path.to_path_buf(), err));
+    }
+    for (path, count) in outcome.unmatched_qualified_paths {
+        *result.unmatched_qualified_paths.entry(path).or_insert(0) += count;
+    }
+    result.total_modifications += outcome.modifications;
+    result.files_modified.extend(outcome.file_modification);
+
+    let file_changed = outcome.change.is_some();
+    let mut first_error = None;
+    for ((report, changed), error) in result
+        .steps
+        .iter_mut()
+        .zip(outcome.steps_changed)
+        .zip(outcome.step_errors)
+    {
+        if changed {
+            report.files_changed += 1;
+        }
+        if let Some(error) = error {
+            let message = format!("{}", error);
+            if file_changed {
+                report
+                    .failed_in_changed
+                    .push((file_path.to_path_buf(), message.clone()));
+            }
+            report.last_error = Some(message.clone());
+            result.last_error = Some(message);
+            first_error.get_or_insert(error);
+        }
+    }
+
+    if let Some(change) = outcome.change {
+        result.files_changed += 1;
+        on_change(change);
+    }
+    first_error
+}
+
+#[cfg(test)]
+mod tests {
+    use tempfile::TempDir;
+
+    use super::*;
+    use crate::operations::AddDeriveOp;
+
+    #[test]
+    fn test_execute_each_streams_changes() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let files: Vec<PathBuf> = ["a.rs", "b.rs", "c.rs"]
+            .iter()
+            .map(|name| temp_dir.path().join(name))
+            .collect();
+        std::fs::write(&files[0], "struct Config { port: u16 }\n")?;
+        std::fs::write(&files[1], "struct Other;\n")?;
+        std::fs::write(&files[2], "struct Config { host: String }\n")?;
+
+        let op = Operation::AddDerive(AddDeriveOp {
+            target_name: "Config".to_string(),
+            target_type: "struct".to_string(),
+            derives: vec!["Debug".to_string()],
+            where_filter: None,
+        });
+
+        let mut streamed = Vec::new();
+        let result = execute_each(&files, &op, &ExecuteOpts::default(), |change| {
+            streamed.push(change.path);
+        })?;
+
+        assert!(result.changes.is_empty());
+        assert_eq!(result.files_changed, 2);
+        assert_eq!(streamed, vec![files[0].clone(), files[2].clone()]);
+
+        let collected = execute(&files, &op, &ExecuteOpts::default())?;
+        assert_eq!(collected.files_changed, 2);
+        assert_eq!(collected.changes.len(), 2);
+        Ok(())
+    }
+
+    #[test]
+    fn test_execute_plan_applies_all_steps_in_one_pass() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let file = temp_dir.path().join("lib.rs");
+        std::fs::write(
+            &file,
+            "pub struct User {\n    id: u64,\n}\n\npub enum Status {\n    Draft,\n}\n",
+        )?;
+        let files = vec![file.clone()];
+
+        let ops: Vec<Operation> = serde_json::from_str(
+            r#"[
+                {"type": "AddDerive", "target_name": "User", "target_type": "struct", "derives": ["Clone"]},
+                {"type": "AddStructField", "struct_name": "User", "field_def": "name: String", "position": "Last"},
+                {"type": "AddEnumVariant", "enum_name": "Status", "variant_def": "Archived", "position": "Last"}
+            ]"#,
+        )?;
+
+        let opts = ExecuteOpts {
+            apply: true,
+            ..Default::default()
         };
-        save_run_metadata(&metadata, &state_dir)?;
-        result.run_id = Some(run_id);
+        let result = execute_plan(&files, &ops, &opts)?;
+        assert_eq!(result.files_changed, 1);
+        assert_eq!(result.changes.len(), 1);
+
+        // Matches running the steps one after another
+        let sequential = temp_dir.path().join("sequential.rs");
+        std::fs::write(&sequential, &result.changes[0].old_content)?;
+        for op in &ops {
+            execute(std::slice::from_ref(&sequential), op, &opts)?;
+        }
+        assert_eq!(
+            std::fs::read_to_string(&file)?,
+            std::fs::read_to_string(&sequential)?
+        );
+
+        let written = std::fs::read_to_string(&file)?;
+        assert!(written.contains("Clone"));
+        assert!(written.contains("name: String"));
+        assert!(written.contains("Archived"));
+        Ok(())
     }
 
-    Ok(result)
+    #[test]
+    fn test_parallel_execute_matches_sequential() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let files: Vec<PathBuf> = (0..12)
+            .map(|i| temp_dir.path().join(format!("m{i}.rs")))
+            .collect();
+        for (i, file) in files.iter().enumerate() {
+            let source = match i % 3 {
+                0 => "pub enum Status { Draft, Published }\n",
+                1 => "fn f(s: Status) -> u8 { match s { Status::Draft => 0, _ => 1 } }\n",
+                _ => "fn g() {}\n",
+            };
+            std::fs::write(file, source)?;
+        }
+
+        let op: Operation = serde_json::from_str(
+            r#"{"type": "RenameEnumVariant", "enum_name": "Status", "old_variant": "Draft", "new_variant": "Pending"}"#,
+        )?;
+
+        let sequential = execute(&files, &op, &ExecuteOpts::default())?;
+        let mut streamed = Vec::new();
+        let parallel = execute_each(
+            &files,
+            &op,
+            &ExecuteOpts {
+                parallel: true,
+                ..Default::default()
+            },
+            |change| streamed.push(change),
+        )?;
+
+        assert_eq!(parallel.files_changed, sequential.files_changed);
+        assert_eq!(parallel.total_modifications, sequential.total_modifications);
+        assert_eq!(streamed.len(), sequential.changes.len());
+        for (a, b) in streamed.iter().zip(&sequential.changes) {
+            assert_eq!(a.path, b.path);
+            assert_eq!(a.new_content, b.new_content);
+        }
+        Ok(())
+    }
+
+    #[test]
+    fn test_parallel_apply_records_files_written_before_an_error() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let state_dir = temp_dir.path().join("state");
+        let files: Vec<PathBuf> = ["a.rs", "missing.rs", "c.rs"]
+            .iter()
+            .map(|name| temp_dir.path().join(name))
+            .collect();
+        std::fs::write(&files[0], "pub enum Status { Draft, Published }\n")?;
+        std::fs::write(&files[2], "pub enum Status { Draft, Archived }\n")?;
+
+        let op: Operation = serde_json::from_str(
+            r#"{"type": "RenameEnumVariant", "enum_name": "Status", "old_variant": "Draft", "new_variant": "Pending"}"#,
+        )?;
+        let opts = ExecuteOpts {
+            apply: true,
+            parallel: true,
+            ..Default::default()
+        };
+
+        let mut streamed = Vec::new();
+        let err = apply_plan_with_state(
+            &files,
+            std::slice::from_ref(&op),
+            &opts,
+            &state_dir,
+            "rs-hack rename".to_string(),
+            |change| streamed.push(change.path),
+        )
+        .expect_err("the missing file should fail the run");
+        assert!(format!("{:?}", err).contains("missing.rs"));
+
+        // Both readable files were written, reported, and recorded
+        assert_eq!(streamed, vec![files[0].clone(), files[2].clone()]);
+        assert!(std::fs::read_to_string(&files[2])?.contains("Pending"));
+        let index = crate::state::RunsIndex::load(&state_dir)?;
+        assert_eq!(index.runs.len(), 1);
+        let run = index.runs.values().next().expect("one run");
+        let recorded: Vec<_> = run.files_modified.iter().map(|m| &m.path).collect();
+        assert_eq!(recorded, vec![&files[0], &files[2]]);
+        Ok(())
+    }
+
+    #[test]
+    fn test_revert_undoes_a_multi_step_plan() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let state_dir = temp_dir.path().join("state");
+        let file = temp_dir.path().join("lib.rs");
+        let original = "pub struct User {\n    id: u64,\n}\n\npub enum Status {\n    Draft,\n}\n";
+        std::fs::write(&file, original)?;
+
+        // Two steps edit `User`: revert has to land the pre-plan backup last
+        let ops: Vec<Operation> = serde_json::from_str(
+            r#"[
+                {"type": "AddDerive", "target_name": "User", "target_type": "struct", "derives": ["Clone"]},
+                {"type": "AddStructField", "struct_name": "User", "field_def": "name: String", "position": "Last"},
+                {"type": "AddEnumVariant", "enum_name": "Status", "variant_def": "Archived", "position": "Last"}
+            ]"#,
+        )?;
+        let opts = ExecuteOpts {
+            apply: true,
+            ..Default::default()
+        };
+        let result = apply_plan_with_state(
+            std::slice::from_ref(&file),
+            &ops,
+            &opts,
+            &state_dir,
+            "rs-hack batch".to_string(),
+            |_| {},
+        )?;
+        let run_id = result.run_id.expect("applied plan is recorded");
+        assert!(std::fs::read_to_string(&file)?.contains("Archived"));
+
+        crate::state::revert_run(&run_id, false, &state_dir)?;
+
+        // Revert reformats, so compare syntax rather than bytes
+        let restored = std::fs::read_to_string(&file)?;
+        assert_eq!(syn::parse_file(&restored)?, syn::parse_file(original)?);
+        Ok(())
+    }
+
+    #[test]
+    fn test_plan_reports_steps_that_changed_nothing_or_failed() -> Result<()> {
+        let temp_dir = TempDir::new()?;
+        let files: Vec<PathBuf> = ["a.rs", "b.rs"]
+            .iter()
+            .map(|name| temp_dir.path().join(name))
+            .collect();
+        std::fs::write(&files[0], "pub struct User { id: u64 }\n")?;
+        std::fs::write(&files[1], "pub enum Status { Draft }\n")?;
+
+        let ops: Vec<Operation> = serde_json::from_str(
+            r#"[
+                {"type": "AddDerive", "target_name": "User", "target_type": "struct", "derives": ["Clone"]},
+                {"type": "AddEnumVariant", "enum_name": "Status", "variant_def": "Archived", "position": "Last"},
+                {"type": "AddDerive", "target_name": "Missing", "target_type": "struct", "derives": ["Clone"]}
+            ]"#,
+        )?;
+        let result = execute_plan(&files, &ops, &ExecuteOpts::default())?;
+
+        // Each file is written with the steps that applied to it
+        assert_eq!(result.files_changed, 2);
+        assert_eq!(result.steps.len(), 3);
+        assert_eq!(result.steps[0].files_changed, 1);
+        assert_eq!(result.steps[1].files_changed, 1);
+        assert_eq!(
+            result.steps[1].failed_in_changed,
+            vec![(files[0].clone(), "Enum 'Status' not found".to_string())]
+        );
+        assert_eq!(result.steps[2].files_changed, 0);
+        assert!(result.steps[2].last_error.is_some());
+
+        // A lone file still fails when no step applies to it
+        assert!(execute_plan(&files[1..], &ops[..1], &ExecuteOpts::default()).is_err());
+        Ok(())
+    }
 }
@@ -1,7 +1,7 @@
 //! File discovery: glob/dir traversal and exclusion filtering for `.rs` files,
 //! plus the kind→node-type expansion used by `find` and friends.
 
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 
 use anyhow::{Context, Result};
 use glob::glob;
@@ -66,6 +66,49 @@ pub fn collect_rust_files_with_exclusions(
     Ok(files)
 }
 
+/// Directories whose listings `collect_rust_files(&[pattern])` reads: every
+/// directory under a directory path, or, for a glob, every directory matching
+/// one of its leading components. A `.rs` file can only enter or leave the
+/// expansion through a change to one of these listings. Empty for a file.
+pub fn rust_file_dirs(pattern: &Path) -> Vec<PathBuf> {
+    let pattern_str = pattern.to_string_lossy();
+
+    if !(pattern_str.contains('*') || pattern_str.contains('?') || pattern_str.contains('[')) {
+        if !pattern.is_dir() {
+            return Vec::new();
+        }
+        return WalkDir::new(pattern)
+            .into_iter()
+            .filter_map(|e| e.ok())
+            .filter(|e| e.file_type().is_dir())
+            .map(|e| e.into_path())
+            .collect();
+    }
+
+    // Components before the first glob are only descended through: the
+    // deepest of them is listed, then every directory the glob part matches
+    let components: Vec<_> = pattern.components().collect();
+    let first_glob = components
+        .iter()
+        .position(|c| c.as_os_str().to_string_lossy().contains(['*', '?', '[']))
+        .unwrap_or(0);
+    let mut prefix: PathBuf = components[..first_glob].iter().collect();
+    let mut dirs = vec![if prefix.as_os_str().is_empty() {
+        PathBuf::from(".")
+    } else {
+        prefix.clone()
+    }];
+    for component in &components[first_glob..components.len() - 1] {
+        prefix.push(component);
+        if let Ok(entries) = glob(&prefix.to_string_lossy()) {
+            dirs.extend(entries.filter_map(|e| e.ok()).filter(|p| p.is_dir()));
+        }
+    }
+    dirs.sort();
+    dirs.dedup();
+    dirs
+}
+
 pub fn expand_kind_to_node_types(kind: &str) -> Vec<&'static str> {
     match kind {
         "struct" => vec!["struct", "struct-literal"],
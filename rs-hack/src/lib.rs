@@ -1,12 +1,14 @@
 //! Core library for AST-aware Rust refactoring.
 //! Re-exports operations, editor, diff, surgical edits, and state management.
 
+pub mod ast_cache;
 pub mod commands;
 pub mod diff;
 pub mod editor;
 pub mod execute;
 pub mod files;
 pub mod operations;
+pub mod parallel;
 pub mod path_resolver;
 pub mod state;
 pub mod surgical;
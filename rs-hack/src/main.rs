@@ -66,7 +66,8 @@ struct Cli {
     #[arg(long, global = true, num_args = 0..)]
     exclude: Vec<String>,
 
-    /// Limit the number of instances to modify (stops after N modifications)
+    /// Limit the number of instances to modify (stops after N modifications).
+    /// For `find`, caps matches per query and stops scanning once reached.
     #[arg(long, global = true)]
     limit: Option<usize>,
 
@@ -541,6 +542,11 @@ NOTES:
         #[arg(long)]
         validate: bool,
 
+        /// Rewrite files on worker threads (all cores but two). Worth it for broad renames
+        /// over large trees; ignored with --limit
+        #[arg(long)]
+        parallel: bool,
+
         /// Apply changes (default is dry-run)
         #[arg(long)]
         apply: bool,
@@ -647,8 +653,12 @@ MIGRATION:
     },
 
     /// Batch operation from JSON or YAML specification
+    ///
+    /// All operations run as one plan: each file is parsed and written once
+    /// with every operation applied in order, and an applied batch is
+    /// recorded as a single revertible run.
     Batch {
-        /// Path to JSON or YAML file with batch operations
+        /// Path to JSON or YAML file with batch operations (`-` for stdin)
         #[arg(short, long)]
         spec: PathBuf,
 
@@ -657,6 +667,15 @@ MIGRATION:
         apply: bool,
     },
 
+    /// Serve commands over stdin/stdout for a long-running client (MCP server)
+    ///
+    /// Each request is one line holding a JSON array of arguments, e.g.
+    /// ["find", "--paths", "src", "--node-type", "struct"]. Each reply is a
+    /// JSON header line {"ok": bool, "stdout": N, "stderr": M} followed by
+    /// exactly N bytes of the command's stdout and M bytes of its stderr.
+    #[command(hide = true)]
+    Serve,
+
     /// Show sibling files, twin-dir matches, and test files for a .rs file
     Neighbors {
         /// Path to a Rust source file
@@ -747,6 +766,11 @@ MIGRATION:
     # Include documentation comments in output
     rs-hack find --paths src --node-type function --name main --include-comments true
 
+    # Run several queries in one pass (each file parsed once; JSON array out)
+    echo '[{\"node_type\": \"struct-literal\", \"name\": \"Config\"},
+           {\"node_type\": \"match-arm\", \"name\": \"Status::Draft\"}]' \\
+        | rs-hack find --paths src --batch -
+
 OUTPUT FORMATS:
     snippets    Show full code snippets with file locations (default, most readable)
     locations   Show only file:line:column (grep-style, good for scripting)
@@ -790,13 +814,22 @@ OUTPUT FORMATS:
         #[arg(long, default_value = "true", action = clap::ArgAction::Set)]
         include_comments: bool,
 
-        /// Output format: "json", "locations", "snippets"
+        /// Output format: "json", "json-soa" (one array per attribute), "locations", "snippets"
         #[arg(short = 'f', long, default_value = "snippets")]
         format: String,
 
         /// Show N raw lines of context before each snippet match (like grep -B N)
         #[arg(long)]
         context: Option<usize>,
+
+        /// Run a batch of queries from a JSON file ("-" reads stdin). Each file is parsed once
+        /// for the whole batch; prints a JSON array with one result per query
+        #[arg(long, value_name = "FILE")]
+        batch: Option<PathBuf>,
+
+        /// Shard files across worker threads (all cores but two) for large trees
+        #[arg(long)]
+        parallel: bool,
     },
 
     /// [LEGACY] Add derive macros - use 'rs-hack add' instead
@@ -1859,8 +1892,10 @@ fn show_target_hints(
 }
 
 fn main() -> Result<()> {
-    let cli = Cli::parse();
+    run(Cli::parse())
+}
 
+fn run(cli: Cli) -> Result<()> {
     match cli.command {
         Commands::AddStructField {
             paths,
@@ -2151,9 +2186,16 @@ fn main() -> Result<()> {
             node_type,
             edit_mode,
             validate,
+            parallel,
             apply,
         } => {
             let files = collect_rust_files_with_exclusions(&paths, &cli.exclude)?;
+            let opts = rs_hack::execute::ExecuteOpts {
+                apply,
+                limit: cli.limit,
+                parallel,
+                ..Default::default()
+            };
 
             // Parse edit mode
             let edit_mode = edit_mode
@@ -2182,15 +2224,13 @@ fn main() -> Result<()> {
                     content_filter: None,
                     action: TransformAction::Replace { with: to },
                 });
-                execute_operation_with_state(
+                execute_with_state_opts(
                     &files,
                     &op,
-                    apply,
-                    None,
+                    &opts,
                     &cli.local_state,
                     &cli.format,
                     cli.summary,
-                    cli.limit,
                 )?;
                 return Ok(());
             }
@@ -2217,15 +2257,13 @@ fn main() -> Result<()> {
                         content_filter: None,
                         action: TransformAction::Replace { with: to },
                     });
-                    execute_operation_with_state(
+                    execute_with_state_opts(
                         &files,
                         &op,
-                        apply,
-                        None,
+                        &opts,
                         &cli.local_state,
                         &cli.format,
                         cli.summary,
-                        cli.limit,
                     )?;
                     return Ok(());
                 } else {
@@ -2269,15 +2307,13 @@ fn main() -> Result<()> {
                         edit_mode,
                     });
 
-                    execute_operation_with_state(
+                    execute_with_state_opts(
                         &files,
                         &op,
-                        apply,
-                        None,
+                        &opts,
                         &cli.local_state,
                         &cli.format,
                         cli.summary,
-                        cli.limit,
                     )?;
                 }
             } else {
@@ -2344,15 +2380,13 @@ fn main() -> Result<()> {
                             edit_mode,
                         });
 
-                        execute_operation_with_state(
+                        execute_with_state_opts(
                             &files,
                             &op,
-                            apply,
-                            None,
+                            &opts,
                             &cli.local_state,
                             &cli.format,
                             cli.summary,
-                            cli.limit,
                         )?;
                     }
                 } else if found_as_enum_variant {
@@ -2377,15 +2411,13 @@ fn main() -> Result<()> {
                                 edit_mode,
                             });
 
-                            execute_operation_with_state(
+                            execute_with_state_opts(
                                 &files,
                                 &op,
-                                apply,
-                                None,
+                                &opts,
                                 &cli.local_state,
                                 &cli.format,
                                 cli.summary,
-                                cli.limit,
                             )?;
                         }
                     } else {
@@ -2506,8 +2538,17 @@ fn main() -> Result<()> {
         }
 
         Commands::Batch { spec, apply } => {
-            let content =
-                std::fs::read_to_string(&spec).context("Failed to read batch spec file")?;
+            let content = if spec.as_os_str() == "-" {
+                use std::io::Read;
+
+                let mut buf = String::new();
+                std::io::stdin()
+                    .read_to_string(&mut buf)
+                    .context("Failed to read batch spec from stdin")?;
+                buf
+            } else {
+                std::fs::read_to_string(&spec).context("Failed to read batch spec file")?
+            };
 
             // Auto-detect format based on file extension
             let batch: BatchSpec = if spec.extension().and_then(|s| s.to_str()) == Some("yaml")
@@ -2521,7 +2562,7 @@ fn main() -> Result<()> {
                     .context("Failed to parse batch spec (tried both JSON and YAML)")?
             };
 
-            execute_batch(&batch, apply, &cli.exclude)?;
+            execute_batch(&batch, apply, &cli.exclude, cli.local_state)?;
         }
 
         Commands::Find {
@@ -2535,9 +2576,40 @@ fn main() -> Result<()> {
             include_comments,
             format,
             context,
+            batch,
+            parallel,
         } => {
             use operations::InspectResult;
 
+            if let Some(batch_path) = batch {
+                use std::io::Read;
+
+                use rs_hack::commands::find::{BatchFindArgs, FindQuery, run_batch};
+
+                let content = if batch_path.as_os_str() == "-" {
+                    let mut buf = String::new();
+                    std::io::stdin()
+                        .read_to_string(&mut buf)
+                        .context("Failed to read batch queries from stdin")?;
+                    buf
+                } else {
+                    std::fs::read_to_string(&batch_path)
+                        .context("Failed to read batch query file")?
+                };
+                let queries: Vec<FindQuery> = serde_json::from_str(&content)
+                    .context("Failed to parse batch queries (expected a JSON array)")?;
+
+                let results = run_batch(&BatchFindArgs {
+                    paths,
+                    exclude: cli.exclude.clone(),
+                    queries,
+                    parallel,
+                    limit: cli.limit,
+                })?;
+                println!("{}", serde_json::to_string_pretty(&results)?);
+                return Ok(());
+            }
+
             let args = rs_hack::commands::find::FindArgs {
                 paths: paths.clone(),
                 exclude: cli.exclude.clone(),
@@ -2549,10 +2621,20 @@ fn main() -> Result<()> {
                 field_name: field_name.clone(),
                 include_comments,
                 context,
+                parallel,
+                limit: cli.limit,
             };
 
             let result = rs_hack::commands::find::run(&args)?;
 
+            if format == "json-soa" {
+                println!(
+                    "{}",
+                    serde_json::to_string_pretty(&result.into_columns(true))?
+                );
+                return Ok(());
+            }
+
             // Field-mode rendering
             if let rs_hack::commands::find::FindResult::Field {
                 matches: all_locations,
@@ -2977,79 +3059,23 @@ fn main() -> Result<()> {
                 }
                 _ => {
                     anyhow::bail!(
-                        "Unknown format: {}. Use 'json', 'locations', or 'snippets'",
+                        "Unknown format: {}. Use 'json', 'json-soa', 'locations', or 'snippets'",
                         format
                     );
                 }
             }
         }
 
+        Commands::Serve => serve()?,
+
         Commands::Neighbors { path } => {
             let report = rs_hack::commands::neighbors::run(&path)?;
-
-            // Display the path relative to cwd if possible
-            let display = |p: &std::path::Path| -> String {
-                std::env::current_dir()
-                    .ok()
-                    .and_then(|cwd| p.strip_prefix(&cwd).ok().map(|r| r.to_path_buf()))
-                    .unwrap_or_else(|| p.to_path_buf())
-                    .to_string_lossy()
-                    .into_owned()
-            };
-
-            println!("Neighbors for {}:", display(&report.target));
-            if report.siblings.is_empty() {
-                println!("  Siblings: (none)");
-            } else {
-                let s: Vec<String> = report.siblings.iter().map(|p| display(p)).collect();
-                println!("  Siblings: {}", s.join(", "));
-            }
-            if report.twin_files.is_empty() {
-                println!("  Twin dirs: (none)");
-            } else {
-                let s: Vec<String> = report.twin_files.iter().map(|p| display(p)).collect();
-                println!("  Twin dirs: {}", s.join(", "));
-            }
-            if report.test_files.is_empty() {
-                println!("  Tests: (none)");
-            } else {
-                let s: Vec<String> = report.test_files.iter().map(|p| display(p)).collect();
-                println!("  Tests: {}", s.join(", "));
-            }
+            rs_hack::commands::neighbors::render(&report);
         }
 
         Commands::Impls { paths, r#trait } => {
-            use rs_hack::commands::find::FindArgs;
-
-            let args = FindArgs {
-                paths,
-                exclude: cli.exclude.clone(),
-                node_type: Some("trait-impl".to_string()),
-                name: Some(r#trait.clone()),
-                include_comments: false,
-                ..Default::default()
-            };
-
-            let result = rs_hack::commands::find::run(&args)?;
-            let matches = match result {
-                rs_hack::commands::find::FindResult::Nodes { matches } => matches,
-                _ => vec![],
-            };
-
-            if matches.is_empty() {
-                println!("Trait {} implemented by: (none found)", r#trait);
-            } else {
-                println!("Trait {} implemented by:", r#trait);
-                for m in &matches {
-                    // identifier = "TraitName for TypeName" — split to get type name
-                    let type_name = m
-                        .identifier
-                        .split_once(" for ")
-                        .map(|x| x.1)
-                        .unwrap_or(&m.identifier);
-                    println!("  {} ({}:{})", type_name, m.file_path, m.location.line);
-                }
-            }
+            let report = rs_hack::commands::impls::run(&paths, &r#trait, &cli.exclude)?;
+            rs_hack::commands::impls::render(&report);
         }
 
         Commands::MatchAudit { paths, r#enum } => {
@@ -4327,6 +4353,153 @@ fn parse_position(pos: &str) -> Result<InsertPosition> {
     }
 }
 
+thread_local! {
+    /// Command line recorded in run metadata. `serve` sets it per request;
+    /// otherwise it is this process's own argv.
+    static COMMAND_LINE: std::cell::RefCell<Option<String>> = const { std::cell::RefCell::new(None) };
+}
+
+fn command_line() -> String {
+    COMMAND_LINE
+        .with_borrow(|line| line.clone())
+        .unwrap_or_else(|| std::env::args().collect::<Vec<_>>().join(" "))
+}
+
+/// Stack for `serve` request threads: the main thread's default on Linux,
+/// which a one-shot run gets.
+#[cfg(unix)]
+const SERVE_STACK_SIZE: usize = 8 << 20;
+
+/// `rs-hack serve`: run newline-delimited JSON argv requests in this process,
+/// so a long-running client pays process startup once rather than per call.
+/// Nothing parsed is kept between requests.
+///
+/// Each reply is a JSON header line `{"ok": bool, "stdout": N, "stderr": M}`
+/// followed by exactly N bytes of the command's stdout and M bytes of its
+/// stderr, as a one-shot `rs-hack` run would have printed them.
+#[cfg(unix)]
+fn serve() -> Result<()> {
+    use std::io::{BufRead, Read, Seek, Write};
+    use std::os::fd::AsFd;
+
+    // Commands print straight to fds 1 and 2, so each request points those
+    // at scratch files; replies go to a duplicate of the original stdout
+    let stdout_fd = std::io::stdout().as_fd().try_clone_to_owned()?;
+    let stderr_fd = std::io::stderr().as_fd().try_clone_to_owned()?;
+    let mut replies = std::fs::File::from(stdout_fd.try_clone()?);
+    let mut captured_stdout = tempfile::tempfile().context("Failed to create capture file")?;
+    let mut captured_stderr = tempfile::tempfile().context("Failed to create capture file")?;
+
+    let mut stdin = std::io::stdin().lock();
+    let mut line = Vec::new();
+    loop {
+        line.clear();
+        if stdin
+            .read_until(b'\n', &mut line)
+            .context("Failed to read serve request")?
+            == 0
+        {
+            break;
+        }
+        if line.trim_ascii().is_empty() {
+            continue;
+        }
+
+        for file in [&mut captured_stdout, &mut captured_stderr] {
+            file.set_len(0)?;
+            file.rewind()?;
+        }
+        rustix::stdio::dup2_stdout(&captured_stdout)?;
+        rustix::stdio::dup2_stderr(&captured_stderr)?;
+
+        // Each request runs on a fresh thread: proc-macro2 keeps a copy of every
+        // source it parses in a per-thread, append-only map with u32 offsets,
+        // so one long-lived thread would never free a parse and would
+        // eventually overflow the offsets
+        let outcome = std::thread::scope(|scope| {
+            let worker = std::thread::Builder::new()
+                .stack_size(SERVE_STACK_SIZE)
+                .spawn_scoped(scope, || serve_one(&line))
+                .context("Failed to start request thread")?;
+            worker.join().unwrap_or_else(|_| {
+                Err(anyhow::anyhow!(
+                    "rs-hack panicked while handling the request"
+                ))
+            })
+        });
+        let ok = match outcome {
+            Ok(()) => true,
+            Err(e) => {
+                eprintln!("Error: {:?}", e);
+                false
+            }
+        };
+
+        let flushed = std::io::stdout().flush();
+        rustix::stdio::dup2_stdout(&stdout_fd)?;
+        rustix::stdio::dup2_stderr(&stderr_fd)?;
+        flushed?;
+
+        let mut output = Vec::new();
+        let mut errors = Vec::new();
+        for (file, buf) in [
+            (&mut captured_stdout, &mut output),
+            (&mut captured_stderr, &mut errors),
+        ] {
+            file.rewind()?;
+            file.read_to_end(buf)?;
+        }
+
+        let header = serde_json::json!({
+            "ok": ok,
+            "stdout": output.len(),
+            "stderr": errors.len(),
+        });
+        writeln!(replies, "{}", header)?;
+        replies.write_all(&output)?;
+        replies.write_all(&errors)?;
+        replies.flush()?;
+    }
+    Ok(())
+}
+
+/// Redirecting the process's output per request needs `dup2`.
+#[cfg(not(unix))]
+fn serve() -> Result<()> {
+    anyhow::bail!("serve is only supported on Unix")
+}
+
+fn serve_one(request: &[u8]) -> Result<()> {
+    let argv: Vec<String> =
+        serde_json::from_slice(request).context("Expected a JSON array of arguments")?;
+
+    let cli = match Cli::try_parse_from(std::iter::once("rs-hack".to_string()).chain(argv.clone()))
+    {
+        Ok(cli) => cli,
+        Err(e) if !e.use_stderr() => {
+            // --help / --version
+            print!("{}", e);
+            return Ok(());
+        }
+        Err(e) => anyhow::bail!("{}", e),
+    };
+
+    // stdin carries the request stream, so commands can't also read from it
+    let reads_stdin = match &cli.command {
+        Commands::Serve => anyhow::bail!("Already serving"),
+        Commands::Batch { spec, .. } => spec.as_os_str() == "-",
+        Commands::Find { batch, .. } => batch.as_ref().is_some_and(|path| path.as_os_str() == "-"),
+        _ => false,
+    };
+    if reads_stdin {
+        anyhow::bail!("Reading input from stdin ('-') is not supported in serve mode");
+    }
+
+    // Set on this request's own thread, so it ends with the request
+    COMMAND_LINE.set(Some(format!("rs-hack {}", argv.join(" "))));
+    run(cli)
+}
+
 /// Print operation-specific hints when no changes were made
 fn print_operation_hints(op: &Operation) {
     match op {
@@ -4390,45 +4563,66 @@ fn execute_operation(
         apply,
         output: output.cloned(),
         limit,
+        ..Default::default()
     };
 
-    let result = rs_hack::execute::execute(files, op, &opts)?;
-    render_execute_result(&result, op, format, show_summary, apply, output);
+    // Each file's diff is printed as soon as it is processed; contents are
+    // dropped right after instead of being held for the whole run.
+    let mut total_stats = DiffStats::default();
+    let result = rs_hack::execute::execute_each(files, op, &opts, |change| {
+        render_change(&change, format, apply, output, &mut total_stats);
+    })?;
+    render_execute_result(
+        &result,
+        std::slice::from_ref(op),
+        format,
+        show_summary,
+        apply,
+        output,
+        &total_stats,
+    );
     Ok(())
 }
 
-/// CLI-side rendering of an `ExecuteResult`. Reproduces the original
-/// `execute_operation` stdout/stderr output from structured fields.
-fn render_execute_result(
-    result: &rs_hack::execute::ExecuteResult,
-    op: &Operation,
+/// CLI-side rendering of one changed file (diff, summary, or status line).
+fn render_change(
+    change: &rs_hack::execute::FileChange,
     format: &str,
-    show_summary: bool,
     apply: bool,
     output: Option<&PathBuf>,
+    total_stats: &mut DiffStats,
 ) {
-    let mut total_stats = DiffStats::default();
-
-    for change in &result.changes {
-        if format == "diff" {
-            let stats = print_diff(&change.path, &change.old_content, &change.new_content);
-            total_stats.add(&stats);
-        } else if format == "summary" {
-            let stats = print_summary_diff(&change.path, &change.old_content, &change.new_content);
-            total_stats.add(&stats);
-        } else if apply {
-            if let Some(out) = output {
-                println!("✓ Written to: {}", out.display());
-            } else {
-                println!("✓ Modified: {}", change.path.display());
-            }
-        } else if let Some(out) = output {
-            println!("Would write to: {}", out.display());
+    if format == "diff" {
+        let stats = print_diff(&change.path, &change.old_content, &change.new_content);
+        total_stats.add(&stats);
+    } else if format == "summary" {
+        let stats = print_summary_diff(&change.path, &change.old_content, &change.new_content);
+        total_stats.add(&stats);
+    } else if apply {
+        if let Some(out) = output {
+            println!("✓ Written to: {}", out.display());
         } else {
-            println!("Would modify: {}", change.path.display());
+            println!("✓ Modified: {}", change.path.display());
         }
+    } else if let Some(out) = output {
+        println!("Would write to: {}", out.display());
+    } else {
+        println!("Would modify: {}", change.path.display());
     }
+}
 
+/// CLI-side rendering of an `ExecuteResult` once every change has been
+/// rendered by `render_change`. Reproduces the original `execute_operation`
+/// stdout/stderr output from structured fields.
+fn render_execute_result(
+    result: &rs_hack::execute::ExecuteResult,
+    ops: &[Operation],
+    format: &str,
+    show_summary: bool,
+    apply: bool,
+    output: Option<&PathBuf>,
+    total_stats: &DiffStats,
+) {
     for (path, err) in &result.parse_errors {
         eprintln!("⚠️  Skipping {}: {}", path.display(), err);
     }
@@ -4451,18 +4645,23 @@ fn render_execute_result(
     }
 
     if !result.unmatched_qualified_paths.is_empty() {
-        if !result.changes.is_empty() {
+        if result.files_changed > 0 {
             println!("\n⚠️  Note: Some instances were not matched:");
         }
         render_unmatched_paths(&result.unmatched_qualified_paths);
-    } else if result.changes.is_empty() {
+    } else if result.files_changed == 0 {
         println!("No changes made - target not found in any files");
-        if let Some(err) = &result.last_error {
-            eprintln!("\n📋 Diagnostic: {}", err);
+        // Plans get the diagnostic and hints per step, from `render_plan_steps`
+        if let [op] = ops {
+            if let Some(err) = &result.last_error {
+                eprintln!("\n📋 Diagnostic: {}", err);
+            }
+            print_operation_hints(op);
         }
-        print_operation_hints(op);
     }
 
+    render_plan_steps(result, ops);
+
     if format == "diff" && show_summary {
         total_stats.print_summary();
     } else if format == "default" && !apply {
@@ -4471,7 +4670,7 @@ fn render_execute_result(
         );
         println!(
             "Summary: {} file(s) would be modified",
-            result.changes.len()
+            result.files_changed
         );
     }
 }
@@ -4510,13 +4709,52 @@ fn render_unmatched_paths(unmatched: &std::collections::HashMap<String, usize>)
     }
 }
 
-fn execute_batch(batch: &BatchSpec, apply: bool, exclude_patterns: &[String]) -> Result<()> {
-    for op in &batch.operations {
-        let files = collect_rust_files_with_exclusions(
-            std::slice::from_ref(&batch.base_path),
-            exclude_patterns,
-        )?;
-        execute_operation(&files, op, apply, None, "default", false, None)?;
+/// Run a batch spec as one plan: every file under `base_path` is read,
+/// parsed, and written once with all operations applied in order.
+fn execute_batch(
+    batch: &BatchSpec,
+    apply: bool,
+    exclude_patterns: &[String],
+    local_state: bool,
+) -> Result<()> {
+    let files = collect_rust_files_with_exclusions(
+        std::slice::from_ref(&batch.base_path),
+        exclude_patterns,
+    )?;
+    let opts = rs_hack::execute::ExecuteOpts {
+        apply,
+        ..Default::default()
+    };
+
+    let command = command_line();
+    let mut total_stats = DiffStats::default();
+    let result = rs_hack::execute::execute_plan_with_state_each(
+        &files,
+        &batch.operations,
+        &opts,
+        local_state,
+        command,
+        |change| render_change(&change, "default", apply, None, &mut total_stats),
+    )?;
+
+    if apply {
+        render_execute_with_state_result(
+            &result,
+            &batch.operations,
+            "default",
+            false,
+            &total_stats,
+        );
+    } else {
+        render_execute_result(
+            &result,
+            &batch.operations,
+            "default",
+            false,
+            apply,
+            None,
+            &total_stats,
+        );
     }
     Ok(())
 }
@@ -4536,42 +4774,67 @@ fn execute_operation_with_state(
         apply,
         output: output.cloned(),
         limit,
+        ..Default::default()
     };
+    execute_with_state_opts(files, op, &opts, local_state, format, show_summary)
+}
+
+/// `execute_operation_with_state` for callers that set further
+/// `ExecuteOpts` fields, such as `parallel`.
+fn execute_with_state_opts(
+    files: &[PathBuf],
+    op: &Operation,
+    opts: &rs_hack::execute::ExecuteOpts,
+    local_state: &bool,
+    format: &str,
+    show_summary: bool,
+) -> Result<()> {
+    let apply = opts.apply;
+    let output = opts.output.as_ref();
 
-    let command = std::env::args().collect::<Vec<_>>().join(" ");
-    let result = rs_hack::execute::execute_with_state(files, op, &opts, *local_state, command)?;
+    let command = command_line();
+    let mut total_stats = DiffStats::default();
+    let result = rs_hack::execute::execute_with_state_each(
+        files,
+        op,
+        opts,
+        *local_state,
+        command,
+        |change| render_change(&change, format, apply, output, &mut total_stats),
+    )?;
 
     // The lib falls back to plain `execute` (no state tracking) when the call
     // would not have written: dry runs and `--output` overrides. Match the
     // renderer to the path that actually ran so dry runs say "Would modify".
     if !apply || output.is_some() {
-        render_execute_result(&result, op, format, show_summary, apply, output);
+        render_execute_result(
+            &result,
+            std::slice::from_ref(op),
+            format,
+            show_summary,
+            apply,
+            output,
+            &total_stats,
+        );
     } else {
-        render_execute_with_state_result(&result, op, format, show_summary);
+        render_execute_with_state_result(
+            &result,
+            std::slice::from_ref(op),
+            format,
+            show_summary,
+            &total_stats,
+        );
     }
     Ok(())
 }
 
 fn render_execute_with_state_result(
     result: &rs_hack::execute::ExecuteResult,
-    op: &Operation,
+    ops: &[Operation],
     format: &str,
     show_summary: bool,
+    total_stats: &DiffStats,
 ) {
-    let mut total_stats = DiffStats::default();
-
-    for change in &result.changes {
-        if format == "diff" {
-            let stats = print_diff(&change.path, &change.old_content, &change.new_content);
-            total_stats.add(&stats);
-        } else if format == "summary" {
-            let stats = print_summary_diff(&change.path, &change.old_content, &change.new_content);
-            total_stats.add(&stats);
-        } else {
-            println!("✓ Modified: {}", change.path.display());
-        }
-    }
-
     for (path, err) in &result.parse_errors {
         eprintln!("⚠️  Skipping {}: {}", path.display(), err);
     }
@@ -4601,18 +4864,57 @@ fn render_execute_with_state_result(
             "\n📝 Run ID: {} (use 'rs-hack revert {}' to undo)",
             run_id, run_id
         );
-    } else if result.changes.is_empty() {
+    } else if result.files_changed == 0 {
         println!("No changes made - target not found in any files");
-        if let Some(err) = &result.last_error {
-            eprintln!("\n📋 Diagnostic: {}", err);
+        // Plans get the diagnostic and hints per step, from `render_plan_steps`
+        if let [op] = ops {
+            if let Some(err) = &result.last_error {
+                eprintln!("\n📋 Diagnostic: {}", err);
+            }
+            print_operation_hints(op);
         }
-        print_operation_hints(op);
     }
 
     if !result.unmatched_qualified_paths.is_empty() {
-        if !result.changes.is_empty() {
+        if result.files_changed > 0 {
             println!("\n⚠️  Note: Some instances were not matched:");
         }
         render_unmatched_paths(&result.unmatched_qualified_paths);
     }
+
+    render_plan_steps(result, ops);
+}
+
+/// Per-step notes for plans of more than one operation. Steps apply
+/// independently, so a step that changed nothing gets the diagnostic and
+/// hints a lone operation would, and files written without a step that
+/// failed in them are listed.
+fn render_plan_steps(result: &rs_hack::execute::ExecuteResult, ops: &[Operation]) {
+    if ops.len() < 2 {
+        return;
+    }
+
+    for (i, (op, step)) in ops.iter().zip(&result.steps).enumerate() {
+        if step.files_changed == 0 {
+            println!(
+                "\n⚠️  Step {} ({}) made no changes - target not found in any files",
+                i + 1,
+                op.kind_name()
+            );
+            if let Some(err) = &step.last_error {
+                eprintln!("📋 Diagnostic: {}", err);
+            }
+            print_operation_hints(op);
+        } else if !step.failed_in_changed.is_empty() {
+            eprintln!(
+                "\n⚠️  Step {} ({}) did not apply to {} file(s) that other steps changed:",
+                i + 1,
+                op.kind_name(),
+                step.failed_in_changed.len()
+            );
+            for (path, err) in &step.failed_in_changed {
+                eprintln!("   {} — {}", path.display(), err);
+            }
+        }
+    }
 }
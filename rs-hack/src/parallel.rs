@@ -0,0 +1,72 @@
+//! Order-preserving fan-out of per-file work across scoped threads.
+//!
+//! syn ASTs can't cross threads (proc-macro2 keeps span positions in a
+//! thread-local source map), so work is split by file: each worker reads,
+//! parses, and processes its own shard, and only plain result data is handed
+//! back.
+
+use std::num::NonZeroUsize;
+use std::path::PathBuf;
+
+/// Worker count for sharded runs: all cores but two, and never fewer than one.
+pub fn default_jobs() -> usize {
+    std::thread::available_parallelism()
+        .map(NonZeroUsize::get)
+        .unwrap_or(1)
+        .saturating_sub(2)
+        .max(1)
+}
+
+/// Apply `f` to every file on up to `jobs` threads and return the results in
+/// input order. Files are split into contiguous, disjoint shards; with one job
+/// (or one file) everything runs on the calling thread.
+pub fn map_files<T, F>(files: &[PathBuf], jobs: usize, f: F) -> Vec<T>
+where
+    T: Send,
+    F: Fn(&PathBuf) -> T + Sync,
+{
+    let jobs = jobs.clamp(1, files.len().max(1));
+    if jobs == 1 {
+        return files.iter().map(&f).collect();
+    }
+
+    let shard_len = files.len().div_ceil(jobs);
+    let f = &f;
+    std::thread::scope(|scope| {
+        let handles: Vec<_> = files
+            .chunks(shard_len)
+            .map(|shard| scope.spawn(move || shard.iter().map(f).collect::<Vec<T>>()))
+            .collect();
+
+        handles
+            .into_iter()
+            .flat_map(|handle| {
+                handle
+                    .join()
+                    .unwrap_or_else(|panic| std::panic::resume_unwind(panic))
+            })
+            .collect()
+    })
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_map_files_preserves_order() {
+        let files: Vec<PathBuf> = (0..37).map(|i| PathBuf::from(format!("{i}.rs"))).collect();
+
+        for jobs in [1, 2, 4, 64] {
+            let names = map_files(&files, jobs, |p| p.display().to_string());
+            let expected: Vec<String> = files.iter().map(|p| p.display().to_string()).collect();
+            assert_eq!(names, expected, "jobs = {jobs}");
+        }
+    }
+
+    #[test]
+    fn test_map_files_empty() {
+        let out: Vec<usize> = map_files(&[], 8, |_| 1);
+        assert!(out.is_empty());
+    }
+}
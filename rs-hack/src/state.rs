@@ -461,6 +461,18 @@ fn restore_struct_literal(
 
 /// Save run metadata
 pub fn save_run_metadata(run: &RunMetadata, state_dir: &Path) -> Result<()> {
+    write_run_file(run, state_dir)?;
+
+    // Update index
+    let mut index = RunsIndex::load(state_dir)?;
+    index.add_run(index_entry(run));
+    index.save(state_dir)?;
+
+    Ok(())
+}
+
+/// Write a run's own `<run_id>.json`, the full record revert reads from.
+fn write_run_file(run: &RunMetadata, state_dir: &Path) -> Result<()> {
     fs::create_dir_all(state_dir)?;
     let metadata_path = state_dir.join(format!("{}.json", run.run_id));
     let content = serde_json::to_string_pretty(run)?;
@@ -473,15 +485,34 @@ pub fn save_run_metadata(run: &RunMetadata, state_dir: &Path) -> Result<()> {
     drop(file);
 
     fs::rename(temp_path, metadata_path)?;
-
-    // Update index
-    let mut index = RunsIndex::load(state_dir)?;
-    index.add_run(run.clone());
-    index.save(state_dir)?;
-
     Ok(())
 }
 
+/// A run as recorded in `runs.json`: everything but the backup node
+/// contents. Those are only needed by revert, which loads the run's own
+/// file, so leaving them out keeps the index (read and rewritten on every
+/// applied run) from growing with the size of each run's edits.
+fn index_entry(run: &RunMetadata) -> RunMetadata {
+    RunMetadata {
+        run_id: run.run_id.clone(),
+        timestamp: run.timestamp,
+        command: run.command.clone(),
+        operation: run.operation.clone(),
+        files_modified: run
+            .files_modified
+            .iter()
+            .map(|file| FileModification {
+                path: file.path.clone(),
+                hash_before: file.hash_before.clone(),
+                hash_after: file.hash_after.clone(),
+                backup_nodes: Vec::new(),
+            })
+            .collect(),
+        status: run.status,
+        can_revert: run.can_revert,
+    }
+}
+
 /// Load run metadata
 pub fn load_run_metadata(run_id: &str, state_dir: &Path) -> Result<RunMetadata> {
     let metadata_path = state_dir.join(format!("{}.json", run_id));
@@ -540,19 +571,22 @@ pub fn revert_run(run_id: &str, force: bool, state_dir: &Path) -> Result<()> {
         println!("  ✓ Restored: {}", file.path.display());
     }
 
-    // Mark run as reverted
-    let mut index = RunsIndex::load_or_reset(state_dir)?;
-    if let Some(run_meta) = index.get_run_mut(run_id) {
-        run_meta.status = RunStatus::Reverted;
-        run_meta.can_revert = false;
-    }
-    index.save(state_dir)?;
-
-    // Update individual metadata file
+    // Mark run as reverted in its own file and in the index. The index entry
+    // is updated in place: one load and one save.
     let mut run = run;
     run.status = RunStatus::Reverted;
     run.can_revert = false;
-    save_run_metadata(&run, state_dir)?;
+    write_run_file(&run, state_dir)?;
+
+    let mut index = RunsIndex::load_or_reset(state_dir)?;
+    match index.get_run_mut(run_id) {
+        Some(run_meta) => {
+            run_meta.status = RunStatus::Reverted;
+            run_meta.can_revert = false;
+        }
+        None => index.add_run(index_entry(&run)),
+    }
+    index.save(state_dir)?;
 
     println!("✓ Run {} reverted successfully", run_id);
     Ok(())
@@ -625,7 +659,7 @@ pub fn clean_old_state(keep_days: u32, state_dir: &Path) -> Result<()> {
 
             cleaned += 1;
         } else {
-            new_index.add_run(run.clone());
+            new_index.add_run(index_entry(run));
         }
     }
 
@@ -763,4 +797,75 @@ mod tests {
 
         Ok(())
     }
+
+    #[test]
+    fn test_revert_marks_index_and_run_file() -> Result<()> {
+        use crate::operations::{BackupNode, NodeLocation};
+        let temp_dir = TempDir::new()?;
+        let state_dir = temp_dir.path().join("state");
+        let file_path = temp_dir.path().join("user.rs");
+
+        let original = "pub struct User {\n    id: u64,\n}\n";
+        let hash_before = {
+            fs::write(&file_path, original)?;
+            hash_file(&file_path)?
+        };
+        fs::write(
+            &file_path,
+            "pub struct User {\n    id: u64,\n    email: String,\n}\n",
+        )?;
+
+        let run = RunMetadata {
+            run_id: "def5678".to_string(),
+            timestamp: Utc::now(),
+            command: "rs-hack add".to_string(),
+            operation: "AddStructField".to_string(),
+            files_modified: vec![FileModification {
+                path: file_path.clone(),
+                hash_before,
+                hash_after: hash_file(&file_path)?,
+                backup_nodes: vec![BackupNode {
+                    node_type: "ItemStruct".to_string(),
+                    identifier: "User".to_string(),
+                    original_content: original.trim_end().to_string(),
+                    location: NodeLocation {
+                        line: 1,
+                        column: 0,
+                        end_line: 3,
+                        end_column: 1,
+                    },
+                }],
+            }],
+            status: RunStatus::Applied,
+            can_revert: true,
+        };
+        save_run_metadata(&run, &state_dir)?;
+
+        // The index carries the summary; backup contents live in the run file
+        let index = RunsIndex::load(&state_dir)?;
+        let entry = index.get_run("def5678").expect("run indexed");
+        assert!(entry.files_modified[0].backup_nodes.is_empty());
+        assert_eq!(
+            load_run_metadata("def5678", &state_dir)?.files_modified[0]
+                .backup_nodes
+                .len(),
+            1
+        );
+
+        revert_run("def5678", false, &state_dir)?;
+        assert!(!fs::read_to_string(&file_path)?.contains("email"));
+
+        let index = RunsIndex::load(&state_dir)?;
+        assert_eq!(index.runs.len(), 1);
+        assert_eq!(
+            index.get_run("def5678").map(|r| r.status),
+            Some(RunStatus::Reverted)
+        );
+        let reverted = load_run_metadata("def5678", &state_dir)?;
+        assert_eq!(reverted.status, RunStatus::Reverted);
+        assert!(!reverted.can_revert);
+        assert_eq!(reverted.files_modified[0].backup_nodes.len(), 1);
+
+        Ok(())
+    }
 }
@@ -358,6 +358,45 @@ pub fn handle_status(status: Status) -> String {
         assert!(!result.unwrap().changed); // Should return false - no missing variants
     }
 
+    #[test]
+    fn test_add_match_arm_auto_detect_many_variants() {
+        let variants: Vec<String> = (0..200).map(|i| format!("V{}", i)).collect();
+        let covered: String = variants
+            .iter()
+            .step_by(2)
+            .map(|v| format!("        Big::{} => 0,\n", v))
+            .collect();
+        let code = format!(
+            "pub enum Big {{ {} }}\n\npub fn handle(b: Big) -> u8 {{\n    match b {{\n{}    }}\n}}\n",
+            variants.join(", "),
+            covered
+        );
+
+        let mut editor = RustEditor::new(&code).unwrap();
+        let op = AddMatchArmOp {
+            pattern: String::new(),
+            body: "todo!()".to_string(),
+            function_name: Some("handle".to_string()),
+            auto_detect: true,
+            enum_name: Some("Big".to_string()),
+        };
+
+        assert!(editor.add_match_arm(&op).unwrap().changed);
+        let output = editor.to_string();
+        for v in &variants {
+            assert_eq!(
+                output.matches(&format!("Big::{} =>", v)).count(),
+                1,
+                "{}",
+                v
+            );
+        }
+
+        // Re-running finds nothing left to add
+        let mut editor = RustEditor::new(&output).unwrap();
+        assert!(!editor.add_match_arm(&op).unwrap().changed);
+    }
+
     #[test]
     fn test_update_match_arm() {
         let code = r#"